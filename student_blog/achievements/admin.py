@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
-from .models import StudentProfile, Achievement, ContactMessage
+from .models import StudentProfile, Achievement, ContactMessage, ImageUploadJob, ModerationLog
+from .moderation import moderate
 
 class StudentProfileInline(admin.StackedInline):
     model = StudentProfile
@@ -16,6 +17,7 @@ class CustomUserAdmin(UserAdmin):
     list_filter = ('is_staff', 'is_superuser', 'is_active', 'studentprofile__year', 'studentprofile__department')
     search_fields = ('username', 'first_name', 'last_name', 'email', 'studentprofile__roll_number')
     ordering = ('-date_joined',)
+    list_select_related = ('studentprofile',)
     
     def get_roll_number(self, obj):
         return obj.studentprofile.roll_number if hasattr(obj, 'studentprofile') else 'N/A'
@@ -37,10 +39,11 @@ class AchievementAdmin(admin.ModelAdmin):
     list_display = ('name', 'student_name', 'student_roll_number', 'event', 'prize', 'competition_level', 'is_approved', 'date_achieved', 'created_at')
     list_filter = ('is_approved', 'competition', 'date_achieved', 'created_at')
     search_fields = ('name', 'event', 'student__username', 'student__first_name', 'student__last_name', 'student__studentprofile__roll_number')
-    list_editable = ('is_approved',)
-    readonly_fields = ('created_at', 'updated_at')
+    # Approval goes through the actions below, which log who approved what
+    readonly_fields = ('is_approved', 'created_at', 'updated_at')
     date_hierarchy = 'created_at'
     actions = ['approve_achievements', 'disapprove_achievements']
+    list_select_related = ('student__studentprofile',)
     
     def student_name(self, obj):
         return obj.student_name
@@ -57,12 +60,12 @@ class AchievementAdmin(admin.ModelAdmin):
     competition_level.short_description = 'Competition Level'
     
     def approve_achievements(self, request, queryset):
-        updated = queryset.update(is_approved=True)
+        updated = moderate(queryset.values_list('pk', flat=True), ModerationLog.APPROVE, request.user)
         self.message_user(request, f'{updated} achievements approved successfully.')
     approve_achievements.short_description = "Approve selected achievements"
     
     def disapprove_achievements(self, request, queryset):
-        updated = queryset.update(is_approved=False)
+        updated = moderate(queryset.values_list('pk', flat=True), ModerationLog.REJECT, request.user)
         self.message_user(request, f'{updated} achievements disapproved.')
     disapprove_achievements.short_description = "Disapprove selected achievements"
 
@@ -94,6 +97,40 @@ class ContactMessageAdmin(admin.ModelAdmin):
             return True
         return super().has_change_permission(request, obj)
 
+@admin.register(ImageUploadJob)
+class ImageUploadJobAdmin(admin.ModelAdmin):
+    list_display = ('original_name', 'achievement', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('original_name', 'achievement__name', 'achievement__student__username')
+    readonly_fields = ('achievement', 'staged_name', 'original_name', 'attempts', 'error',
+                       'created_at', 'started_at', 'finished_at')
+    list_select_related = ('achievement',)
+    actions = ['retry_jobs']
+
+    def retry_jobs(self, request, queryset):
+        updated = queryset.filter(status=ImageUploadJob.FAILED).update(
+            status=ImageUploadJob.PENDING, attempts=0, error='')
+        self.message_user(request, f'{updated} failed jobs queued again.')
+    retry_jobs.short_description = "Retry selected failed jobs"
+
+@admin.register(ModerationLog)
+class ModerationLogAdmin(admin.ModelAdmin):
+    list_display = ('achievement_name', 'action', 'moderator', 'note', 'created_at')
+    list_filter = ('action', 'created_at')
+    search_fields = ('achievement_name', 'moderator__username', 'note')
+    date_hierarchy = 'created_at'
+    list_select_related = ('moderator',)
+
+    # The log is append-only: entries are written by achievements.moderation
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 # Re-register UserAdmin
 admin.site.unregister(User)
 admin.site.register(User, CustomUserAdmin)
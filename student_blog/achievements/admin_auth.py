@@ -1,6 +1,40 @@
-from django.contrib.auth.decorators import user_passes_test
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import REDIRECT_FIELD_NAME, decorators
+from django.contrib.auth.views import redirect_to_login
 from django.contrib import messages
-from django.shortcuts import redirect
+from django.shortcuts import redirect, resolve_url
+
+async def load_user(request):
+    """
+    ``request.user``, looked up in a worker thread. Async views call this
+    before using the user or rendering a template (the auth context processor
+    exposes it), as the lazy lookup queries the session and user tables, which
+    can't be done on the event loop. Django 5.0 has ``request.auser()`` for this.
+    """
+    user = request.user
+    await sync_to_async(lambda: user.is_authenticated)()  # evaluates the lazy object
+    return user
+
+def user_passes_test(test_func, login_url=None, redirect_field_name=REDIRECT_FIELD_NAME):
+    """
+    Django's ``user_passes_test``, extended to ``async def`` views, which
+    Django 4.2 doesn't support: the user is loaded first with ``load_user``.
+    """
+    def decorator(view_func):
+        if not iscoroutinefunction(view_func):
+            return decorators.user_passes_test(test_func, login_url, redirect_field_name)(view_func)
+
+        @wraps(view_func)
+        async def _wrapper_view(request, *args, **kwargs):
+            if test_func(await load_user(request)):
+                return await view_func(request, *args, **kwargs)
+            return redirect_to_login(request.get_full_path(), resolve_url(login_url or settings.LOGIN_URL),
+                                     redirect_field_name)
+        return _wrapper_view
+    return decorator
 
 def staff_required(function=None, login_url='home'):
     """
@@ -0,0 +1,148 @@
+"""
+Registering a whole intake of students from an admissions CSV.
+
+Rows are validated with ``StudentImportForm`` and checked against each other
+and the database for taken usernames (ignoring case, like the signup form),
+emails and roll numbers (one query per ``BATCH_SIZE`` rows and field). If
+every row is valid, passwords are hashed in a process pool, since hashing
+dominates the cost of a registration, and users and profiles are written with
+``bulk_create`` in one transaction. ``bulk_create`` sends no signals, so no
+placeholder profiles are made. A clash with a student registered meanwhile is
+reported as an ``AdmissionsError`` too, and nothing is imported.
+
+Rows with a blank password get an unusable one; those students can't log in
+until a password is set for them.
+"""
+
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from .forms import StudentImportForm
+from .models import StudentProfile
+from .stats import invalidate_home_stats
+
+BATCH_SIZE = 1000
+DEFAULT_DEPARTMENT = "Computer Science & Engineering"
+DEFAULT_YEAR = 2025
+UNIQUE_FIELDS = (('username', User), ('email', User), ('roll_number', StudentProfile))
+# Compared ignoring case, as the signup form does
+CASE_INSENSITIVE_FIELDS = {'username'}
+
+
+class AdmissionsError(ValueError):
+    """Raised with ``errors``, a list of ``(line, message)``, when rows can't be imported."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} errors in the admissions file")
+
+
+def read_admissions_csv(file):
+    """``(line, row)`` pairs from a CSV file with a header row."""
+    reader = csv.DictReader(file)
+    missing = [name for name in ('username', 'email', 'first_name', 'last_name', 'roll_number')
+               if name not in (reader.fieldnames or [])]
+    if missing:
+        raise AdmissionsError([(1, f"Missing columns: {', '.join(missing)}")])
+    return [(reader.line_num, row) for row in reader]
+
+
+def validate_rows(rows):
+    """Cleaned data for each ``(line, row)``, or raise AdmissionsError listing every problem."""
+    errors, cleaned = [], []
+    for line, row in rows:
+        form = StudentImportForm(row)
+        if form.is_valid():
+            cleaned.append((line, form.cleaned_data))
+        else:
+            errors.extend((line, f"{field}: {' '.join(messages)}") for field, messages in form.errors.items())
+
+    for field, model in UNIQUE_FIELDS:
+        if field in CASE_INSENSITIVE_FIELDS:
+            key, column = str.lower, f'{field}_lower'
+            existing = model.objects.annotate(**{column: Lower(field)})
+        else:
+            key, column, existing = str, field, model.objects
+        seen = {}
+        for line, data in cleaned:
+            value = key(data[field])
+            if value in seen:
+                errors.append((line, f"{field}: {data[field]} is also on line {seen[value]}."))
+            seen.setdefault(value, line)
+        values = [key(data[field]) for _, data in cleaned]
+        for start in range(0, len(values), BATCH_SIZE):
+            taken = set(existing.filter(**{f'{column}__in': values[start:start + BATCH_SIZE]})
+                        .values_list(column, flat=True))
+            errors.extend((line, f"{field}: {data[field]} is already registered.")
+                          for line, data in cleaned[start:start + BATCH_SIZE] if key(data[field]) in taken)
+    if errors:
+        raise AdmissionsError(sorted(errors))
+    return [data for _, data in cleaned]
+
+
+def _init_worker():
+    if not apps.ready:  # spawned rather than forked, so Django isn't set up yet
+        django.setup()
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    ``make_password`` of each password, blank ones made unusable, hashed on
+    ``workers`` processes (default: one per CPU).
+    """
+    given = [password for password in passwords if password]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(given) < 2:
+        hashes = iter(map(make_password, given))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            hashes = iter(list(pool.map(make_password, given, chunksize=max(1, len(given) // 64))))
+    return [next(hashes) if password else make_password(None) for password in passwords]
+
+
+def import_students(rows, workers=None):
+    """Register every ``(line, row)`` of an admissions CSV, or none of them. Returns the number created."""
+    cleaned = validate_rows(rows)
+    if not cleaned:
+        return 0
+    hashes = hash_passwords([data['password'] for data in cleaned], workers=workers)
+
+    try:
+        users = _create_students(cleaned, hashes)
+    except IntegrityError as e:
+        # A clashing student was registered after validate_rows looked; name the rows if we can
+        validate_rows(rows)
+        raise AdmissionsError([(1, f"Nothing imported: {e}")]) from e
+    invalidate_home_stats()  # bulk_create sends no signals
+    return len(users)
+
+
+def _create_students(cleaned, hashes):
+    with transaction.atomic():
+        users = User.objects.bulk_create([
+            User(username=data['username'], email=data['email'], first_name=data['first_name'],
+                 last_name=data['last_name'], password=password)
+            for data, password in zip(cleaned, hashes)
+        ], batch_size=BATCH_SIZE)
+        if users[0].pk is None:  # the backend can't return ids from a bulk insert
+            for start in range(0, len(users), BATCH_SIZE):
+                batch = users[start:start + BATCH_SIZE]
+                ids = dict(User.objects.filter(username__in=[user.username for user in batch])
+                           .values_list('username', 'id'))
+                for user in batch:
+                    user.pk = ids[user.username]
+        StudentProfile.objects.bulk_create([
+            StudentProfile(user_id=user.pk, roll_number=data['roll_number'],
+                           department=data['department'] or DEFAULT_DEPARTMENT,
+                           year=data['year'] or DEFAULT_YEAR, phone=data['phone'] or None)
+            for user, data in zip(users, cleaned)
+        ], batch_size=BATCH_SIZE)
+    return users
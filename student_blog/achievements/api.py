@@ -0,0 +1,159 @@
+"""
+Versioned JSON API.
+
+``/api/v1/achievements/`` lists approved achievements newest first, a page at
+a time by cursor (see ``keyset_page``), with ``?fields=`` choosing the
+fields returned. Every response carries an ETag built from the newest
+``updated_at`` of the achievements and their students' profiles, the row count and an id checksum of the approved set, so
+clients revalidate with ``If-None-Match`` and get a 304 for one aggregate
+query.
+
+``?format=ndjson`` (or ``Accept: application/x-ndjson``) streams every row,
+one JSON object per line, for full exports. Rows are read with
+``.iterator()`` and written as they arrive, so memory stays flat however
+many there are.
+"""
+
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Sum
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_safe
+
+from .models import Achievement
+from .pagination import keyset_page
+from .storage import media_storage
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+EXPORT_CHUNK_SIZE = 2000
+NDJSON = 'application/x-ndjson'
+
+
+def _image_url(row, request):
+    if row['image'] and row['image_available']:
+        return request.build_absolute_uri(media_storage.url(row['image']))
+    return row['image_url'] or None
+
+
+def _student_name(row, request):
+    return f"{row['student__first_name']} {row['student__last_name']}".strip()
+
+
+def _column(name):
+    return (name,), lambda row, request: row[name]
+
+
+# Public field -> (columns it is read from, function building its value from a values() row)
+FIELDS = {
+    name: _column(name) for name in (
+        'id', 'name', 'event', 'prize', 'competition', 'description',
+        'date_achieved', 'created_at', 'updated_at',
+    )
+}
+FIELDS['image_url'] = (('image', 'image_available', 'image_url'), _image_url)
+FIELDS['student_name'] = (('student__first_name', 'student__last_name'), _student_name)
+
+DEFAULT_FIELDS = ('id', 'name', 'event', 'prize', 'competition', 'description',
+                  'date_achieved', 'image_url', 'student_name')
+
+
+def _parse_fields(raw):
+    """Requested field names, or raise ValueError naming the unknown ones."""
+    if not raw:
+        return DEFAULT_FIELDS
+    fields = tuple(dict.fromkeys(field.strip() for field in raw.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(FIELDS)}")
+    return fields
+
+
+def _parse_limit(raw):
+    if not raw:
+        return DEFAULT_LIMIT
+    limit = int(raw)
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    return limit
+
+
+def collection_etag(queryset, request):
+    """
+    Weak ETag for ``queryset`` as requested: the newest ``updated_at`` of the
+    achievements and of their students' profiles (bumped when a student is
+    renamed), the row count and the sum of ids (which changes when one
+    approval is swapped for another), plus the query string, since each
+    selects a different body.
+    """
+    state = queryset.aggregate(last_updated=Max('updated_at'),
+                               student_updated=Max('student__studentprofile__updated_at'),
+                               count=Count('id'), id_sum=Sum('id'))
+    fingerprint = '|'.join([
+        'v2',
+        state['last_updated'].isoformat() if state['last_updated'] else '',
+        state['student_updated'].isoformat() if state['student_updated'] else '',
+        str(state['count']),
+        str(state['id_sum'] or 0),
+        request.META.get('QUERY_STRING', ''),
+        NDJSON if _wants_ndjson(request) else 'json',
+    ])
+    return f'W/"{hashlib.sha1(fingerprint.encode()).hexdigest()}"', state['count']
+
+
+def _wants_ndjson(request):
+    return request.GET.get('format') == 'ndjson' or NDJSON in request.META.get('HTTP_ACCEPT', '')
+
+
+def _serialize(rows, fields, request):
+    for row in rows:
+        yield {field: FIELDS[field][1](row, request) for field in fields}
+
+
+def _ndjson_lines(rows, fields, request):
+    encoder = DjangoJSONEncoder()
+    for item in _serialize(rows, fields, request):
+        yield encoder.encode(item) + '\n'
+
+
+def _finish(response):
+    patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+@require_safe
+def achievements_v1(request):
+    try:
+        fields = _parse_fields(request.GET.get('fields'))
+        limit = _parse_limit(request.GET.get('limit'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    approved = Achievement.objects.filter(is_approved=True)
+    etag, count = collection_etag(approved, request)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return _finish(not_modified)
+
+    columns = {'id', 'created_at'}
+    for field in fields:
+        columns.update(FIELDS[field][0])
+    rows = approved.values(*sorted(columns))
+
+    if _wants_ndjson(request):
+        stream = rows.order_by('-created_at', '-id').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(_ndjson_lines(stream, fields, request), content_type=NDJSON)
+    else:
+        page = keyset_page(rows, after=request.GET.get('after'), page_size=limit)
+        response = JsonResponse({
+            'count': count,
+            'next_cursor': page['next_cursor'],
+            'results': list(_serialize(page['items'], fields, request)),
+        }, encoder=DjangoJSONEncoder)
+    response['ETag'] = etag
+    return _finish(response)
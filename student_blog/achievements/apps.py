@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class AchievementsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'achievements'
+
+    def ready(self):
+        from . import database  # noqa: F401  (applies SQLite pragmas to new connections)
+        from . import fragments  # noqa: F401  (drops cached card and transcript fragments)
+        from . import search  # noqa: F401  (connects the search index signals)
+        from . import stats  # noqa: F401  (invalidates the cached home page figures)
+        from . import thumbnails  # noqa: F401  (queues thumbnails for new uploads)
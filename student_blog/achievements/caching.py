@@ -0,0 +1,185 @@
+"""
+Namespaced access to the Django cache, with hit/miss/eviction counters.
+
+Each ``CacheNamespace`` prefixes its keys with its name, passes its
+``version`` to the backend (bump it when the shape of the cached values
+changes and every old entry is ignored) and applies a default timeout. It
+works over any configured backend: local memory, files or Redis (see
+``CACHE_URL`` in settings).
+
+``get_or_set`` recomputes a missing value once however many requests miss
+it together: threads of one process queue on a lock, and other processes
+wait for whoever holds a short-lived ``<key>:lock`` entry added with
+``cache.add``, falling back to computing it themselves if it never appears.
+Namespaces of values cheaper to compute than that lock is to take are
+created with ``single_flight=False``.
+
+Deleting a key also stores a new random ``<key>:generation`` token. A
+recompute reads the token with its miss and stores its result only if the
+token is unchanged, so an invalidation landing while a value is being
+recomputed (say a transaction committing midway) can't be overwritten by
+a value computed from the old data.
+
+Counters are kept per process and per namespace. A miss on a key this
+process stored and has not deleted, before its timeout, is counted as an
+eviction; with a shared backend a delete from another process looks the
+same, so treat evictions there as an upper bound.
+"""
+
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+
+LOCK_TIMEOUT = 10  # seconds a recompute may hold the cross-process lock
+LOCK_POLL_INTERVAL = 0.05
+GENERATION_TIMEOUT = 60 * 60  # seconds an invalidation is remembered; longer than any recompute
+TRACKED_KEYS = 10000  # stored keys remembered for eviction counting
+
+_MISSING = object()
+# Striped rather than per-key, so the number of locks stays fixed
+_compute_locks = [threading.Lock() for _ in range(64)]
+_metrics_lock = threading.Lock()
+_metrics = {}
+_expiries = OrderedDict()
+
+
+def _record(namespace, counter):
+    with _metrics_lock:
+        _metrics.setdefault(namespace, Counter())[counter] += 1
+
+
+def cache_metrics():
+    """``{namespace: {hits, misses, evictions, sets, hit_rate}}`` for this process."""
+    with _metrics_lock:
+        report = {}
+        for namespace, counts in sorted(_metrics.items()):
+            lookups = counts['hits'] + counts['misses']
+            report[namespace] = {
+                'hits': counts['hits'],
+                'misses': counts['misses'],
+                'evictions': counts['evictions'],
+                'sets': counts['sets'],
+                'hit_rate': round(counts['hits'] / lookups, 4) if lookups else None,
+            }
+        return report
+
+
+def reset_cache_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+        _expiries.clear()
+
+
+class CacheNamespace:
+    """A named slice of the cache ``alias`` with its own version and default timeout."""
+
+    def __init__(self, name, timeout=300, version=1, alias='default', single_flight=True):
+        self.name, self.timeout, self.version, self.alias = name, timeout, version, alias
+        self.single_flight = single_flight
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def make_key(self, key):
+        return f'{self.name}:{key}'
+
+    def _generation_key(self, key):
+        return f'{self.make_key(key)}:generation'
+
+    def _tracking_key(self, key):
+        return (self.alias, self.version, self.make_key(key))
+
+    def get(self, key, default=None):
+        value = self.backend.get(self.make_key(key), _MISSING, version=self.version)
+        if value is _MISSING:
+            self._count_miss(key)
+            return default
+        _record(self.name, 'hits')
+        return value
+
+    def _count_miss(self, key):
+        _record(self.name, 'misses')
+        with _metrics_lock:
+            expires = _expiries.pop(self._tracking_key(key), None)
+        if expires is not None and expires > time.monotonic():
+            _record(self.name, 'evictions')
+
+    def set(self, key, value, timeout=_MISSING):
+        timeout = self.timeout if timeout is _MISSING else timeout
+        self.backend.set(self.make_key(key), value, timeout, version=self.version)
+        _record(self.name, 'sets')
+        expires = float('inf') if timeout is None else time.monotonic() + timeout
+        with _metrics_lock:
+            _expiries[self._tracking_key(key)] = expires
+            _expiries.move_to_end(self._tracking_key(key))
+            while len(_expiries) > TRACKED_KEYS:
+                _expiries.popitem(last=False)
+
+    def delete(self, key):
+        self.delete_many([key])
+
+    def delete_many(self, keys):
+        keys = list(keys)
+        if not keys:
+            return
+        self.backend.delete_many([self.make_key(key) for key in keys], version=self.version)
+        # Tell recomputes already under way that their result is stale
+        generation = uuid.uuid4().hex
+        self.backend.set_many({self._generation_key(key): generation for key in keys},
+                              GENERATION_TIMEOUT, version=self.version)
+        with _metrics_lock:
+            for key in keys:
+                _expiries.pop(self._tracking_key(key), None)
+
+    def _set_unless_invalidated(self, key, value, timeout, generation):
+        """Store a recomputed value, unless ``key`` was deleted since ``generation`` was read."""
+        if self.backend.get(self._generation_key(key), version=self.version) == generation:
+            self.set(key, value, timeout)
+
+    def get_or_set(self, key, compute, timeout=_MISSING):
+        """The cached value of ``key``, computing and storing it once if it is missing."""
+        full_key = self.make_key(key)
+        # One round trip for the value and the generation a recompute will check
+        found = self.backend.get_many([full_key, self._generation_key(key)], version=self.version)
+        if full_key in found:
+            _record(self.name, 'hits')
+            return found[full_key]
+        self._count_miss(key)
+        generation = found.get(self._generation_key(key))
+        if not self.single_flight:
+            value = compute()
+            self._set_unless_invalidated(key, value, timeout, generation)
+            return value
+
+        with _compute_locks[zlib.crc32(full_key.encode()) % len(_compute_locks)]:
+            # Another thread may have filled it, or the key been invalidated, while this one waited
+            found = self.backend.get_many([full_key, self._generation_key(key)], version=self.version)
+            if full_key in found:
+                return found[full_key]
+            generation = found.get(self._generation_key(key))
+            lock_key = f'{full_key}:lock'
+            if self.backend.add(lock_key, 1, LOCK_TIMEOUT, version=self.version):
+                try:
+                    value = compute()
+                    self._set_unless_invalidated(key, value, timeout, generation)
+                finally:
+                    self.backend.delete(lock_key, version=self.version)
+                return value
+
+            # Another process is computing it: wait for its result
+            deadline = time.monotonic() + LOCK_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_INTERVAL)
+                value = self.backend.get(full_key, _MISSING, version=self.version)
+                if value is not _MISSING:
+                    return value
+                if self.backend.get(lock_key, version=self.version) is None:
+                    break  # it gave up without storing a value
+            value = compute()
+            self._set_unless_invalidated(key, value, timeout, generation)
+            return value
@@ -0,0 +1,115 @@
+"""
+Vectorised GPA/CGPA for a whole cohort at once.
+
+``calculate_cgpa`` handles one student's transcript as nested dicts, which is
+fine for a dashboard but slow for department-wide "what-if" runs. The batch
+API here takes a transcript as flat columns (one entry per course unit) and
+computes every semester GPA and student CGPA with NumPy in a single pass.
+
+Sums are accumulated per semester first and then per student, in the same
+order as ``calculate_cgpa``, so results agree with the scalar path to the
+cent when rows are ordered by student, semester and unit.
+
+Grades may be passed as letters or, faster, as integer codes from
+``GRADE_CODES`` (see ``encode_grades``), with -1 marking an ungraded unit.
+"""
+
+from typing import Dict, Optional, Sequence, Union
+
+from .cgpa_calculator import GRADE_CHOICES, GRADE_CODES, GRADE_SCALE
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only the batch API needs it
+    np = None
+
+
+UNGRADED = -1
+
+
+def encode_grades(grades: Sequence[Optional[str]]) -> "np.ndarray":
+    """
+    Letter grades to integer codes. Empty grades become ``UNGRADED``; unknown
+    letters get the code of 'F', which like ``get_quality_points`` scores 0.0.
+    """
+    if np is None:
+        raise ImportError("encode_grades requires NumPy (pip install numpy).")
+    unknown = GRADE_CODES['F']
+    lookup = {}
+    for grade in set(grades):
+        if not grade:
+            lookup[grade] = UNGRADED
+        else:
+            lookup[grade] = GRADE_CODES.get(grade, GRADE_CODES.get(grade.upper().strip(), unknown))
+    return np.fromiter((lookup[grade] for grade in grades), dtype=np.int8, count=len(grades))
+
+
+def _grade_points(grades, grade_scale):
+    """Map grades (letters or codes) to points, plus a mask of graded units."""
+    grades = np.asarray(grades)
+    if grades.dtype.kind not in 'iu':
+        grades = encode_grades(grades.tolist())
+    table = np.array([grade_scale.get(grade, 0.0) for grade, _ in GRADE_CHOICES], dtype=float)
+    graded = grades != UNGRADED
+    points = np.zeros(len(grades), dtype=float)
+    points[graded] = table[grades[graded]]
+    return points, graded
+
+
+def calculate_cohort_cgpa(
+    student_ids: Sequence[int],
+    semester_ids: Sequence[int],
+    grades: Union[Sequence[Optional[str]], "np.ndarray"],
+    credits: Sequence[float],
+    grade_scale: Optional[Dict[str, float]] = None,
+) -> Dict[str, "np.ndarray"]:
+    """
+    Compute per-semester GPA and per-student CGPA from columnar data.
+
+    All four inputs have one entry per course unit. ``grades`` holds letters
+    or integer grade codes. Units without a grade are skipped, as in
+    ``calculate_cgpa``. ``grade_scale`` defaults to
+    ``GRADE_SCALE`` and can be swapped to simulate a different scale.
+
+    Returns a dict of arrays: ``semester_ids``/``semester_student_ids``/``gpa``
+    aligned per semester, and ``student_ids``/``total_gpa_points``/
+    ``total_credits``/``cgpa`` aligned per student. Ids come back sorted.
+    """
+    if np is None:
+        raise ImportError("calculate_cohort_cgpa requires NumPy (pip install numpy).")
+
+    points, graded = _grade_points(grades, grade_scale or GRADE_SCALE)
+    student_ids = np.asarray(student_ids)[graded]
+    semester_ids = np.asarray(semester_ids)[graded]
+    credits = np.asarray(credits, dtype=float)[graded]
+    weighted = points[graded] * credits
+
+    # bincount returns int64 rather than float when nothing is graded, so cast
+    semester_keys, semester_index = np.unique(semester_ids, return_inverse=True)
+    semester_points = np.bincount(semester_index, weights=weighted, minlength=len(semester_keys)).astype(float)
+    semester_credits = np.bincount(semester_index, weights=credits, minlength=len(semester_keys)).astype(float)
+    semester_students = np.empty(len(semester_keys), dtype=student_ids.dtype)
+    semester_students[semester_index] = student_ids
+
+    student_keys, student_index = np.unique(semester_students, return_inverse=True)
+    student_points = np.bincount(student_index, weights=semester_points, minlength=len(student_keys)).astype(float)
+    student_credits = np.bincount(student_index, weights=semester_credits, minlength=len(student_keys)).astype(float)
+
+    gpa = np.divide(semester_points, semester_credits,
+                    out=np.zeros_like(semester_points), where=semester_credits > 0)
+    cgpa = np.divide(student_points, student_credits,
+                     out=np.zeros_like(student_points), where=student_credits > 0)
+
+    # np.round scales by 100 first, which can land ties on the other side of
+    # Python's correctly rounded round(); one call per student keeps parity.
+    cgpa = np.array([round(value, 2) for value in cgpa.tolist()], dtype=float)
+
+    return {
+        'semester_ids': semester_keys,
+        'semester_student_ids': semester_students,
+        'gpa': gpa,
+        'student_ids': student_keys,
+        'total_gpa_points': student_points,
+        'total_credits': student_credits,
+        'cgpa': cgpa,
+    }
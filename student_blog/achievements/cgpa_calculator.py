@@ -1,32 +1,33 @@
 
 
+from decimal import ROUND_HALF_UP, Decimal
 from functools import reduce
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Tuple, Union
 
 
-GRADE_SCALE: Dict[str, float] = {
-    
-    'E-': 1.0,
-    
-    'E+': 1.5,
-    
-    'D': 2.0,
-    'D+': 2.5,
-    
-    'C': 3.0,
-    
-    'C+': 3.5,
-    
-    'B': 4.0,
-    
-    'B+': 4.5,
-    
-    'A': 5.0,
-    
-    'A+': 5.0,
-    
-    'F': 0.0
+# Single source of truth for grades: CourseUnit.GRADE_CHOICES points here.
+# The labels are for display only; points come from GRADE_POINTS_TENTHS.
+GRADE_CHOICES: List[Tuple[str, str]] = [
+    ('A+', 'A+ (5.0)'), ('A', 'A (5.0)'),
+    ('B+', 'B+ (4.5)'), ('B', 'B (4.0)'),
+    ('C+', 'C+ (3.5)'), ('C', 'C (3.0)'),
+    ('D+', 'D+ (2.5)'), ('D', 'D (2.0)'), ('E+', 'E+ (1.5)'), ('E-', 'E- (1.0)'),
+    ('F', 'F (0.0)')
+]
+
+# Grade points in tenths of a point, so the table holds exact integers
+GRADE_POINTS_TENTHS: Dict[str, int] = {
+    'A+': 50, 'A': 50, 'B+': 45, 'B': 40, 'C+': 35, 'C': 30,
+    'D+': 25, 'D': 20, 'E+': 15, 'E-': 10, 'F': 0,
 }
+if set(GRADE_POINTS_TENTHS) != {grade for grade, _ in GRADE_CHOICES}:
+    raise ValueError("GRADE_POINTS_TENTHS must list exactly the grades in GRADE_CHOICES")
+
+# Integer code for each grade: its position in GRADE_CHOICES
+GRADE_CODES: Dict[str, int] = {grade: code for code, (grade, _) in enumerate(GRADE_CHOICES)}
+
+# Grade points as floats, which is what the calculators add up
+GRADE_SCALE: Dict[str, float] = {grade: GRADE_POINTS_TENTHS[grade] / 10 for grade, _ in GRADE_CHOICES}
 
 # Type aliases for clarity
 SubjectData = Dict[str, Union[str, int, float]]
@@ -35,8 +36,24 @@ AllSemestersData = Dict[str, SemesterData]
 
 
 def get_quality_points(grade: str) -> float:
-   
-    return GRADE_SCALE.get(grade.upper().strip(), 0.0)
+    """Grade points for a letter grade; unknown grades count as 0.0."""
+    points = GRADE_SCALE.get(grade)
+    if points is None:
+        # Only normalise on a miss; stored grades already match the table
+        points = GRADE_SCALE.get(grade.upper().strip(), 0.0)
+    return points
+
+
+def cgpa_from_totals(total_points: float, total_credits: float) -> float:
+    """CGPA from summed quality points and credits, rounded like calculate_cgpa."""
+    return round(total_points / total_credits, 2) if total_credits > 0 else 0.0
+
+
+def to_two_places(value: Optional[float]) -> Optional[Decimal]:
+    """Convert a float result into a 2dp Decimal for the model fields."""
+    if value is None:
+        return None
+    return Decimal(str(value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
 
 def calculate_gpa(semester_data: SemesterData) -> float:
@@ -0,0 +1,24 @@
+"""
+Per-connection database setup.
+
+Every new SQLite connection runs ``SQLITE_PRAGMAS`` (or the ``SQLITE_PRAGMAS``
+setting, if there is one). They turn on WAL journaling, so readers no longer
+block a writer committing; ``synchronous=NORMAL``, which in WAL mode syncs at
+checkpoints rather than on every commit; and a ``busy_timeout`` so a writer
+waits for the lock instead of failing with "database is locked".
+"""
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+SQLITE_PRAGMAS = {'journal_mode': 'wal', 'synchronous': 'normal', 'busy_timeout': 5000}
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', SQLITE_PRAGMAS).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
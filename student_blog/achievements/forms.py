@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
+from django.db import transaction
+from django.db.models import Q
 from .models import Achievement, StudentProfile
 
 class UserRegistrationForm(UserCreationForm):
@@ -51,50 +53,73 @@ class UserRegistrationForm(UserCreationForm):
             }),
         }
     
-    def clean_roll_number(self):
-        roll_number = self.cleaned_data['roll_number']
-        if StudentProfile.objects.filter(roll_number=roll_number).exists():
-            raise forms.ValidationError("This roll number is already registered.")
-        return roll_number
-    
-    def clean_email(self):
-        email = self.cleaned_data['email']
-        if User.objects.filter(email=email).exists():
-            raise forms.ValidationError("This email is already registered.")
-        return email
-    
+    def clean_username(self):
+        # Checked together with the email and roll number in clean()
+        return self.cleaned_data['username']
+
+    def clean(self):
+        """Reject a username, email or roll number that is already registered, in one query."""
+        cleaned_data = super().clean()
+        username = cleaned_data.get('username')
+        email = cleaned_data.get('email')
+        roll_number = cleaned_data.get('roll_number')
+        conditions = Q()
+        if username:
+            conditions |= Q(username__iexact=username)
+        if email:
+            conditions |= Q(email=email)
+        if roll_number:
+            conditions |= Q(studentprofile__roll_number=roll_number)
+        if not conditions:
+            return cleaned_data
+        taken = User.objects.filter(conditions).values_list('username', 'email', 'studentprofile__roll_number')
+        for taken_username, taken_email, taken_roll_number in taken:
+            if username and taken_username.lower() == username.lower():
+                self.add_error('username', self.instance.unique_error_message(User, ['username']))
+            if email and taken_email == email:
+                self.add_error('email', "This email is already registered.")
+            if roll_number and taken_roll_number == roll_number:
+                self.add_error('roll_number', "This roll number is already registered.")
+        return cleaned_data
+
+    def validate_unique(self):
+        # The username was checked in clean(); the database constraint catches races
+        pass
+
     def save(self, commit=True):
+        """
+        Create the user and their profile, with the submitted details, in one
+        transaction. ``create_user_profile`` saves the profile attached here
+        instead of a placeholder.
+        """
         user = super().save(commit=False)
         user.email = self.cleaned_data['email']
         user.first_name = self.cleaned_data['first_name']
         user.last_name = self.cleaned_data['last_name']
-    
+        user.pending_profile = StudentProfile(
+            roll_number=self.cleaned_data['roll_number'],
+            department=self.cleaned_data['department'],
+            year=self.cleaned_data['year'],
+            phone=self.cleaned_data['phone'] or None,
+            is_student=True,
+        )
         if commit:
-            user.save()
-        
-        # Use get_or_create to handle existing profiles
-            profile, created = StudentProfile.objects.get_or_create(
-                user=user,
-                defaults={
-                    'roll_number': self.cleaned_data['roll_number'],
-                    'department': self.cleaned_data['department'],
-                    'year': self.cleaned_data['year'],
-                    'phone': self.cleaned_data['phone'] or None,
-                    'is_student': True
-                }
-            )
-        
-        # If profile already existed, update it
-            if not created:
-                profile.roll_number = self.cleaned_data['roll_number']
-                profile.department = self.cleaned_data['department']
-                profile.year = self.cleaned_data['year']
-                profile.phone = self.cleaned_data['phone'] or None
-                profile.is_student = True
-                profile.save()
-    
+            with transaction.atomic():
+                user.save()
         return user
 
+class StudentImportForm(forms.Form):
+    """One row of an admissions CSV (see ``admissions.import_students``)."""
+    username = forms.CharField(max_length=150, validators=[User.username_validator])
+    email = forms.EmailField()
+    first_name = forms.CharField(max_length=150)
+    last_name = forms.CharField(max_length=150)
+    roll_number = forms.CharField(max_length=20)
+    department = forms.CharField(max_length=100, required=False)
+    year = forms.IntegerField(min_value=2000, max_value=2030, required=False)
+    phone = forms.CharField(max_length=15, required=False)
+    password = forms.CharField(required=False, strip=False)
+
 class AchievementForm(forms.ModelForm):
     class Meta:
         model = Achievement
@@ -0,0 +1,71 @@
+"""
+Template fragment caching for achievement cards and semester transcript tables.
+
+Cards are cached with ``{% fragment %}`` (see ``templatetags/fragment_cache``)
+in the ``fragments`` cache namespace, keyed on the achievement's id and
+``updated_at``, so saving an achievement moves it to a fresh key by itself.
+The receivers below remove entries whose content changes without that: a
+deleted achievement, a student renaming themselves, and transcript tables
+(keyed on the semester id alone) whose semester or course units change.
+Code that changes card fields with ``queryset.update()`` bumps ``updated_at``.
+"""
+
+from django.contrib.auth.models import User
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import CacheNamespace
+from .models import Achievement, CourseUnit, Semester
+
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+# A card renders in a fraction of a millisecond, less than taking the recompute lock costs
+fragment_cache = CacheNamespace('fragments', timeout=FRAGMENT_TIMEOUT, single_flight=False)
+
+# Fragment names used with {% fragment %} in the templates
+ACHIEVEMENT_CARD_FRAGMENTS = ('achievement_card', 'home_achievement_card')
+SEMESTER_TABLE_FRAGMENT = 'semester_table'
+
+
+def invalidate_achievement_cards(achievements):
+    """Drop cached cards for ``(id, updated_at)`` pairs."""
+    fragment_cache.delete_many([
+        make_template_fragment_key(fragment, [pk, updated_at])
+        for pk, updated_at in achievements
+        for fragment in ACHIEVEMENT_CARD_FRAGMENTS
+    ])
+
+
+def invalidate_semester_tables(semester_ids):
+    fragment_cache.delete_many([
+        make_template_fragment_key(SEMESTER_TABLE_FRAGMENT, [semester_id])
+        for semester_id in semester_ids if semester_id
+    ])
+
+
+@receiver(post_delete, sender=Achievement)
+def drop_deleted_achievement_card(sender, instance, **kwargs):
+    invalidate_achievement_cards([(instance.pk, instance.updated_at)])
+
+
+@receiver(post_save, sender=User)
+def drop_cards_of_renamed_student(sender, instance, created, **kwargs):
+    # Cards show the student's name; other changes, logins among them, leave them be
+    if created or not getattr(instance, '_renamed', True):
+        return
+    invalidate_achievement_cards(instance.achievements.values_list('id', 'updated_at'))
+
+
+@receiver(post_save, sender=Semester)
+@receiver(post_delete, sender=Semester)
+def drop_semester_table(sender, instance, **kwargs):
+    invalidate_semester_tables([instance.pk])
+
+
+@receiver(pre_save, sender=CourseUnit)
+@receiver(post_save, sender=CourseUnit)
+@receiver(post_delete, sender=CourseUnit)
+def drop_course_unit_tables(sender, instance, **kwargs):
+    # Before saving, _saved_contribution still names the semester a moved unit came from
+    previous = getattr(instance, '_saved_contribution', None)
+    invalidate_semester_tables({instance.semester_id, previous[0] if previous else None})
@@ -0,0 +1,237 @@
+"""
+Database-backed grading services.
+
+The functions in ``cgpa_calculator`` work on plain Python data for a single
+student. This module either feeds them from the database for many students at
+once, or pushes the same arithmetic into SQL so no ORM objects are loaded.
+"""
+
+import time
+
+from django.contrib.auth.models import User
+from django.db.models import Case, ExpressionWrapper, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .cgpa_calculator import GRADE_SCALE, cgpa_from_totals, get_quality_points, to_two_places
+from .models import CourseUnit, Semester, StudentProfile
+
+
+def grade_points_expression():
+    """SQL ``CASE`` mapping ``CourseUnit.grade`` to points from ``GRADE_SCALE``."""
+    return Case(
+        *[When(grade=grade, then=Value(points)) for grade, points in GRADE_SCALE.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def graded_units(**filters):
+    """Course units that count towards GPA, i.e. the ones with a grade."""
+    return CourseUnit.objects.filter(grade__isnull=False, **filters).exclude(grade='')
+
+
+def annotate_grade_totals(queryset):
+    """Add ``points`` and ``credit_total`` sums to a grouped ``values()`` queryset."""
+    credits = Cast('credits', FloatField())
+    return queryset.annotate(
+        points=Sum(ExpressionWrapper(credits * grade_points_expression(), output_field=FloatField())),
+        credit_total=Sum(credits),
+    )
+
+
+def calculate_cgpa_for_student(user):
+    """
+    SQL counterpart of ``calculate_cgpa(build_grades_data_for_user(user))``.
+
+    Semester totals are summed by the database, one row per graded semester,
+    and the result has the same keys and shape as ``calculate_cgpa``.
+    """
+    semester_rows = annotate_grade_totals(
+        graded_units(semester__student=user).values('semester_id', 'semester__name')
+    ).order_by('semester_id')
+
+    gpa_results = {}
+    total_points = total_credits = 0.0
+    for row in semester_rows:
+        points, credits = row['points'] or 0.0, row['credit_total'] or 0.0
+        gpa_results[row['semester__name']] = points / credits if credits > 0 else 0.0
+        total_points += points
+        total_credits += credits
+
+    return {
+        'gpa_results': gpa_results,
+        'total_gpa_points': total_points,
+        'total_credits': total_credits,
+        'cgpa': cgpa_from_totals(total_points, total_credits),
+    }
+
+
+def stored_cgpa_results(profile, semesters):
+    """
+    Same shape as ``calculate_cgpa`` but read from the running totals kept on
+    ``Semester`` and ``StudentProfile``, so no course units are touched.
+    """
+    gpa_results = {
+        semester.name: semester.gpa for semester in semesters if semester.graded_credits > 0
+    }
+    if profile is None:
+        return {'gpa_results': gpa_results, 'total_gpa_points': 0.0, 'total_credits': 0.0, 'cgpa': 0.0}
+    return {
+        'gpa_results': gpa_results,
+        'total_gpa_points': float(profile.total_quality_points or 0),
+        'total_credits': float(profile.total_credits or 0),
+        'cgpa': float(profile.cgpa or 0),
+    }
+
+
+def reconcile_grade_totals(fix=False):
+    """
+    Check the running totals on every ``Semester`` and ``StudentProfile``
+    against a full recompute from course units. With ``fix=True`` the drifted
+    rows are rewritten with the recomputed values.
+
+    Returns ``{'semesters': [...], 'profiles': [...]}`` listing mismatched ids.
+    """
+    zero = to_two_places(0.0)
+
+    def totals_by(field):
+        rows = annotate_grade_totals(graded_units().values(field)).order_by()
+        return {
+            row[field]: (to_two_places(row['points']), to_two_places(row['credit_total']))
+            for row in rows
+        }
+
+    semester_totals = totals_by('semester_id')
+    stale_semesters = []
+    for semester in Semester.objects.only('id', 'quality_points', 'graded_credits').iterator():
+        expected = semester_totals.get(semester.id, (zero, zero))
+        if (semester.quality_points, semester.graded_credits) != expected:
+            semester.quality_points, semester.graded_credits = expected
+            stale_semesters.append(semester)
+
+    student_totals = totals_by('semester__student_id')
+    stale_profiles = []
+    profiles = StudentProfile.objects.only('id', 'user_id', 'total_quality_points', 'total_credits', 'cgpa')
+    for profile in profiles.iterator():
+        points, credits = student_totals.get(profile.user_id, (zero, zero))
+        cgpa = to_two_places(cgpa_from_totals(float(points), float(credits)))
+        stored = (profile.total_quality_points, profile.total_credits or zero, profile.cgpa or zero)
+        if stored != (points, credits, cgpa):
+            profile.total_quality_points, profile.total_credits, profile.cgpa = points, credits, cgpa
+            stale_profiles.append(profile)
+
+    if fix:
+        Semester.objects.bulk_update(stale_semesters, ['quality_points', 'graded_credits'], batch_size=500)
+        StudentProfile.objects.bulk_update(
+            stale_profiles, ['total_quality_points', 'total_credits', 'cgpa'], batch_size=500
+        )
+
+    return {
+        'semesters': [semester.id for semester in stale_semesters],
+        'profiles': [profile.user_id for profile in stale_profiles],
+    }
+
+
+def cohort_queryset(department=None, year=None):
+    """Non-staff users, optionally narrowed to one department and/or year."""
+    students = User.objects.filter(is_staff=False)
+    if department:
+        students = students.filter(studentprofile__department=department)
+    if year:
+        students = students.filter(studentprofile__year=year)
+    return students
+
+
+def _iter_student_totals(students, chunk_size):
+    """
+    Stream graded course units for ``students`` in one query and yield
+    ``(student_id, total_points, total_credits)`` as each student finishes.
+
+    Units are ordered by student and semester so totals are summed per
+    semester first, in the same order ``calculate_cgpa`` adds them up.
+    """
+    rows = (
+        graded_units(semester__student__in=students)
+        .order_by('semester__student_id', 'semester_id', 'id')
+        .values_list('semester__student_id', 'semester_id', 'grade', 'credits')
+        .iterator(chunk_size=chunk_size)
+    )
+
+    current_student = current_semester = None
+    student_points = student_credits = 0.0
+    semester_points = semester_credits = 0.0
+
+    for student_id, semester_id, grade, credits in rows:
+        if semester_id != current_semester:
+            student_points += semester_points
+            student_credits += semester_credits
+            semester_points = semester_credits = 0.0
+            current_semester = semester_id
+        if student_id != current_student:
+            if current_student is not None:
+                yield current_student, student_points, student_credits
+            student_points = student_credits = 0.0
+            current_student = student_id
+
+        credits = float(credits)
+        semester_points += get_quality_points(grade) * credits
+        semester_credits += credits
+
+    if current_student is not None:
+        yield (current_student, student_points + semester_points,
+               student_credits + semester_credits)
+
+
+def _write_profiles(totals, chunk_size):
+    """Persist a chunk of ``{user_id: (cgpa, total_quality_points, total_credits)}``."""
+    profiles = list(StudentProfile.objects.filter(user_id__in=totals.keys()))
+    missing = set(totals) - {profile.user_id for profile in profiles}
+    if missing:
+        StudentProfile.objects.bulk_create([
+            StudentProfile(user_id=user_id, roll_number=f"STU{user_id:04d}", is_student=True)
+            for user_id in missing
+        ])
+        profiles += list(StudentProfile.objects.filter(user_id__in=missing))
+
+    now = timezone.now()
+    for profile in profiles:
+        profile.cgpa, profile.total_quality_points, profile.total_credits = totals[profile.user_id]
+        profile.updated_at = now
+    StudentProfile.objects.bulk_update(
+        profiles, ['cgpa', 'total_quality_points', 'total_credits', 'updated_at'],
+        batch_size=chunk_size,
+    )
+    return len(profiles)
+
+
+def recompute_cohort_cgpa(students=None, chunk_size=500):
+    """
+    Recompute and store CGPA for every student in ``students`` (all non-staff
+    users by default) using a single streamed query over their course units.
+
+    Students with no graded units are left untouched, matching
+    ``compute_and_store_student_cgpa``. Returns a summary with throughput.
+    """
+    if students is None:
+        students = cohort_queryset()
+
+    started = time.perf_counter()
+    updated = 0
+    pending = {}
+
+    for student_id, points, credits in _iter_student_totals(students, chunk_size):
+        pending[student_id] = (to_two_places(cgpa_from_totals(points, credits)),
+                               to_two_places(points), to_two_places(credits))
+        if len(pending) >= chunk_size:
+            updated += _write_profiles(pending, chunk_size)
+            pending = {}
+    if pending:
+        updated += _write_profiles(pending, chunk_size)
+
+    elapsed = time.perf_counter() - started
+    return {
+        'students_updated': updated,
+        'elapsed_seconds': round(elapsed, 3),
+        'students_per_second': round(updated / elapsed, 1) if elapsed > 0 else 0.0,
+    }
@@ -0,0 +1,603 @@
+import random
+import time
+from contextlib import contextmanager
+from itertools import accumulate
+
+from django.core.management.base import BaseCommand, CommandError
+
+from achievements.cgpa_calculator import GRADE_SCALE, calculate_cgpa
+
+
+def timed(func, repeat):
+    """Best wall-clock time of ``repeat`` runs, and the last result."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+@contextmanager
+def scratch_database():
+    """Run against a throwaway test database so real data is never touched."""
+    from django.test.utils import setup_databases, teardown_databases
+
+    old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+
+def synthetic_achievements(size, seed=42):
+    """Bulk-create ``size`` approved achievements with random text, for one student."""
+    from django.contrib.auth.models import User
+    from achievements.models import Achievement
+
+    rng = random.Random(seed)
+    # A Zipf-like vocabulary: a few common words, a long tail of rare ones
+    topics = ('hackathon national robotics gold silver bronze quiz coding olympiad debate '
+              'paper presentation innovation design sprint cloud security machine learning').split()
+    syllables = ('ka', 'ri', 'to', 'mes', 'lan', 'dor', 'vi', 'pe', 'qua', 'zen', 'bo', 'sta')
+    words = topics + [''.join(rng.choices(syllables, k=3)) for _ in range(5000)]
+    rng.shuffle(words)
+    cum_weights = list(accumulate(1 / rank for rank in range(1, len(words) + 1)))
+
+    def text(count):
+        return ' '.join(rng.choices(words, cum_weights=cum_weights, k=count))
+
+    student = User.objects.create_user(username='bench_student')
+    Achievement.objects.bulk_create(
+        (Achievement(student=student, is_approved=True,
+                     name=text(3).title(), event=text(2).title(),
+                     prize=rng.choice(['1st Prize', '2nd Prize', 'Gold Medal']),
+                     competition=rng.choice(['college', 'university', 'state', 'national']),
+                     description=text(25))
+         for _ in range(size)),
+        batch_size=2000,
+    )
+    return student
+
+
+def synthetic_transcripts(students, semesters=8, units=6, seed=42):
+    """Flat ``(student_id, semester_id, grade, credits)`` rows in transcript order."""
+    rng = random.Random(seed)
+    grades = list(GRADE_SCALE) + [None]
+    rows = []
+    semester_id = 0
+    for student_id in range(1, students + 1):
+        for _ in range(semesters):
+            semester_id += 1
+            for _ in range(units):
+                rows.append((student_id, semester_id, rng.choice(grades), rng.choice([2.0, 3.0, 3.5, 4.0])))
+    return rows
+
+
+def bench_asgi(command, size, repeat):
+    """
+    Requests per second and latency percentiles for ``size`` GETs of the
+    async pages at 64 in flight, through Django's WSGI handler on a thread
+    pool (as a threaded WSGI server would run it) and through its ASGI
+    handler on one event loop. No server or sockets: this measures the
+    handlers, not HTTP parsing.
+    """
+    import asyncio
+    import statistics
+    from concurrent.futures import ThreadPoolExecutor
+    from wsgiref.util import setup_testing_defaults
+
+    from django.conf import settings
+    from django.core.asgi import get_asgi_application
+    from django.core.cache import cache
+    from django.core.wsgi import get_wsgi_application
+
+    concurrency = 64
+    paths = ['/', '/achievements/', '/api/achievements/']
+    host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+
+    def wsgi_run(app):
+        def get(path):
+            environ = {'PATH_INFO': path, 'HTTP_HOST': host, 'SERVER_NAME': host}
+            setup_testing_defaults(environ)
+            started = time.perf_counter()
+            statuses = []
+            body = app(environ, lambda status, headers, exc_info=None: statuses.append(status))
+            b''.join(body)
+            body.close()
+            assert statuses[0].startswith('200'), statuses[0]
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(get, (paths[i % len(paths)] for i in range(size))))
+
+    def asgi_run(app):
+        async def get(path, slots):
+            async with slots:
+                scope = {
+                    'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                    'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+                    'query_string': b'', 'root_path': '', 'headers': [(b'host', host.encode())],
+                    'client': ('127.0.0.1', 50000), 'server': (host, 80),
+                }
+                body = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+                statuses = []
+
+                async def receive():
+                    return body.pop() if body else {'type': 'http.disconnect'}
+
+                async def send(message):
+                    if message['type'] == 'http.response.start':
+                        statuses.append(message['status'])
+
+                started = time.perf_counter()
+                await app(scope, receive, send)
+                assert statuses == [200], statuses
+                return time.perf_counter() - started
+
+        async def burst():
+            slots = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(get(paths[i % len(paths)], slots) for i in range(size)))
+
+        return asyncio.run(burst())
+
+    with scratch_database():
+        synthetic_achievements(500)
+        for label, app, run in (('WSGI, 64 threads', get_wsgi_application(), wsgi_run),
+                                ('ASGI, one event loop', get_asgi_application(), asgi_run)):
+            cache.clear()
+            run(app)  # warm the caches and the handler
+            elapsed, latencies = timed(lambda: run(app), repeat)
+            cuts = statistics.quantiles(latencies, n=100)
+            command.stdout.write(f"{label}: {size / elapsed:.0f} requests/s, "
+                                 f"p50 {cuts[49] * 1000:.1f} ms, p99 {cuts[98] * 1000:.1f} ms")
+
+
+def bench_cgpa_batch(command, size, repeat):
+    """Scalar ``calculate_cgpa`` per student vs one ``calculate_cohort_cgpa`` call."""
+    from achievements.cgpa_batch import calculate_cohort_cgpa, encode_grades
+    import numpy as np
+
+    rows = synthetic_transcripts(size)
+    transcripts = {}
+    for student_id, semester_id, grade, credits in rows:
+        if grade:
+            semesters = transcripts.setdefault(student_id, {})
+            semesters.setdefault(f'Sem {semester_id}', []).append({'grade': grade, 'credits': credits})
+    student_ids, semester_ids, grades, credits = zip(*rows)
+    columns = (np.array(student_ids), np.array(semester_ids),
+               np.array(grades, dtype=object), np.array(credits))
+
+    scalar_time, scalar = timed(
+        lambda: {sid: calculate_cgpa(data)['cgpa'] for sid, data in transcripts.items()}, repeat)
+    batch_time, batch = timed(lambda: calculate_cohort_cgpa(*columns), repeat)
+    codes = encode_grades(grades)
+    coded_time, _ = timed(lambda: calculate_cohort_cgpa(columns[0], columns[1], codes, columns[3]), repeat)
+
+    mismatches = sum(
+        scalar[sid] != cgpa for sid, cgpa in zip(batch['student_ids'].tolist(), batch['cgpa'].tolist())
+    )
+    command.stdout.write(f"students: {size}, course units: {len(rows)}")
+    command.stdout.write(f"calculate_cgpa (per student): {scalar_time * 1000:.1f} ms")
+    command.stdout.write(f"calculate_cohort_cgpa (batch): {batch_time * 1000:.1f} ms")
+    command.stdout.write(f"calculate_cohort_cgpa (grade codes): {coded_time * 1000:.1f} ms")
+    command.stdout.write(f"speedup: {scalar_time / batch_time:.1f}x letters, "
+                         f"{scalar_time / coded_time:.1f}x codes, CGPA mismatches: {mismatches}")
+
+
+def legacy_quality_points(grade_str):
+    """The template filter as it was before the shared grade table."""
+    grade_dict = {
+        'A+': 5.0, 'A': 5.0, 'B+': 4.5, 'B': 4.0, 'C+': 3.5, 'C': 3.0,
+        'D+': 2.5, 'D': 2.0, 'E+': 1.5, 'E-': 1.0,
+    }
+    return grade_dict.get(grade_str.upper(), "N/A")
+
+
+TRANSCRIPT_TEMPLATE = """{% load grade_filters %}<table>{% for unit in units %}
+<tr><td>{{ unit.unit_name }}</td><td>{{ unit.credits }}</td><td>{{ unit.grade }}</td>
+<td>{{ unit.grade|QUALITY_POINTS|floatformat:1 }}</td></tr>{% endfor %}</table>"""
+
+
+def bench_grade_lookup(command, size, repeat):
+    """Per-cell grade point lookups and a transcript table render of ``size`` units."""
+    from django.template import Context, Engine, Library
+
+    from achievements.templatetags import grade_filters
+
+    rng = random.Random(42)
+    grades = [rng.choice(list(GRADE_SCALE)) for _ in range(size)]
+    units = [{'unit_name': f'Unit {i}', 'credits': 3.0, 'grade': grade} for i, grade in enumerate(grades)]
+
+    engine = Engine(libraries={'grade_filters': 'achievements.templatetags.grade_filters'})
+    legacy = Library()
+    legacy.filter('legacy_quality_points', legacy_quality_points)
+    engine.template_builtins.append(legacy)
+
+    for label, func, filter_name in (
+        ('legacy filter (dict per call)', legacy_quality_points, 'legacy_quality_points'),
+        ('shared grade table', grade_filters.get_quality_points, 'get_quality_points'),
+    ):
+        lookup_time, _ = timed(lambda: [func(grade) for grade in grades], repeat)
+        template = engine.from_string(TRANSCRIPT_TEMPLATE.replace('QUALITY_POINTS', filter_name))
+        render_time, _ = timed(lambda: template.render(Context({'units': units})), repeat)
+        command.stdout.write(
+            f"{label}: {lookup_time * 1e9 / size:.0f} ns/lookup, "
+            f"render {size} units in {render_time * 1000:.1f} ms"
+        )
+
+
+def bench_search(command, size, repeat):
+    """``icontains`` Q-chain vs the FTS5 index, first page of results per query."""
+    from achievements.pagination import keyset_page
+    from achievements.search import rebuild_index, search_page
+    from achievements.views import approved_achievements
+
+    queries = ['hackathon', 'gold', 'mach', 'robotics champion', 'zzz-no-match']
+    with scratch_database():
+        synthetic_achievements(size)
+        build_time, _ = timed(rebuild_index, 1)
+        command.stdout.write(f"achievements: {size}, index build: {build_time:.2f} s")
+        for query in queries:
+            like_time, _ = timed(lambda: keyset_page(approved_achievements(query)), repeat)
+            fts_time, _ = timed(lambda: search_page(query), repeat)
+            command.stdout.write(
+                f"{query!r:22} icontains {like_time * 1000:8.1f} ms   fts5 {fts_time * 1000:8.1f} ms"
+            )
+
+
+def bench_fragments(command, size, repeat):
+    """Rendering ``size`` achievement cards uncached, into a cold cache, and from a warm one."""
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.template.loader import get_template
+
+    from achievements.caching import cache_metrics, reset_cache_metrics
+    from achievements.models import Achievement
+
+    uncached = get_template('achievements/partials/achievement_card.html')
+    cached = get_template('achievements/partials/achievement_cards.html')
+    with scratch_database():
+        synthetic_achievements(size)
+        achievements = list(Achievement.objects.for_cards())
+
+        plain_time, _ = timed(
+            lambda: ''.join(uncached.render({'achievement': achievement}) for achievement in achievements),
+            repeat)
+
+        def cold():
+            cache.clear()
+            reset_cache_metrics()  # so clearing isn't counted as evictions
+            return cached.render({'achievements': achievements})
+
+        cold_time, _ = timed(cold, repeat)
+        warm_time, _ = timed(lambda: cached.render({'achievements': achievements}), repeat)
+        cache.clear()
+    metrics = cache_metrics()['fragments']
+    backend = settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]
+    command.stdout.write(f"cards: {size}, backend: {backend}")
+    command.stdout.write(f"uncached: {plain_time * 1000:.1f} ms")
+    command.stdout.write(f"cached, cold: {cold_time * 1000:.1f} ms")
+    command.stdout.write(f"cached, warm: {warm_time * 1000:.1f} ms ({plain_time / warm_time:.1f}x faster)")
+    command.stdout.write(f"fragment cache: {metrics['hits']} hits, {metrics['misses']} misses, "
+                         f"{metrics['evictions']} evictions")
+
+
+def bench_stampede(command, size, repeat):
+    """``size`` threads missing one key together: plain get/set vs single-flight ``get_or_set``."""
+    import threading
+
+    from django.core.cache import cache
+
+    from achievements.caching import CacheNamespace
+
+    namespace = CacheNamespace('benchmark', timeout=60)
+
+    def expensive(computed):
+        computed.append(1)
+        time.sleep(0.05)  # stands in for the home page queries
+        return 42
+
+    def naive(computed):
+        value = namespace.get('figures')
+        if value is None:
+            value = expensive(computed)
+            namespace.set('figures', value)
+        return value
+
+    for label, lookup in (
+        ('get, compute, set', naive),
+        ('get_or_set (single-flight)', lambda computed: namespace.get_or_set('figures', lambda: expensive(computed))),
+    ):
+        def burst():
+            namespace.delete('figures')
+            computed = []
+            barrier = threading.Barrier(size)
+
+            def worker():
+                barrier.wait()
+                lookup(computed)
+
+            threads = [threading.Thread(target=worker) for _ in range(size)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return len(computed)
+
+        elapsed, computations = timed(burst, repeat)
+        command.stdout.write(f"{label}: {computations} computations for {size} concurrent misses "
+                             f"in {elapsed * 1000:.0f} ms")
+    cache.clear()
+
+
+def bench_db_writes(command, size, repeat):
+    """``size`` contact-form inserts from 8 threads while 4 threads read, per SQLite profile."""
+    import shutil
+    import tempfile
+    import threading
+    from collections import Counter
+
+    from django.db import OperationalError, connections, transaction
+    from django.test import override_settings
+
+    from achievements.database import SQLITE_PRAGMAS
+    from achievements.models import ContactMessage
+    from student_blog.settings import database_settings
+
+    writers, readers = 8, 4
+    profiles = (
+        ('default journal (before)', {}),
+        ('WAL + synchronous=NORMAL', SQLITE_PRAGMAS),
+    )
+    directory = tempfile.mkdtemp()
+    try:
+        for index, (label, pragmas) in enumerate(profiles):
+            with override_settings(SQLITE_PRAGMAS=pragmas):
+                alias = f'benchmark_{index}'
+                config = database_settings(f'sqlite:///{directory}/{alias}.sqlite3')
+                connections.settings[alias] = connections.configure_settings({'default': config})['default']
+                with connections[alias].schema_editor() as editor:
+                    editor.create_model(ContactMessage)
+                messages = ContactMessage.objects.using(alias)
+
+                def write(count, counts):
+                    try:
+                        for i in range(count):
+                            try:
+                                with transaction.atomic(using=alias):
+                                    messages.create(name=f'Visitor {i}', email='visitor@example.com',
+                                                    subject='Question', message='Hello ' * 40)
+                                counts['writes'] += 1
+                            except OperationalError:  # database is locked
+                                counts['locked'] += 1
+                    finally:
+                        connections[alias].close()
+
+                def read(stop, counts):
+                    try:
+                        while not stop.is_set():
+                            with transaction.atomic(using=alias):
+                                list(messages.filter(is_read=False)[:20])
+                                messages.count()
+                            counts['reads'] += 1
+                    finally:
+                        connections[alias].close()
+
+                def run():
+                    stop = threading.Event()
+                    counts = [Counter() for _ in range(writers + readers)]
+                    threads = [threading.Thread(target=write, args=(size // writers, counts[i]))
+                               for i in range(writers)]
+                    threads += [threading.Thread(target=read, args=(stop, counts[writers + i]))
+                                for i in range(readers)]
+                    for thread in threads:
+                        thread.start()
+                    for thread in threads[:writers]:
+                        thread.join()
+                    stop.set()
+                    for thread in threads[writers:]:
+                        thread.join()
+                    return sum(counts, Counter())
+
+                elapsed, counts = timed(run, repeat)
+                connections[alias].close()
+                del connections.settings[alias]
+                command.stdout.write(
+                    f"{label:26} {counts['writes'] / elapsed:8.0f} writes/s {counts['reads'] / elapsed:8.0f} reads/s"
+                    f"   locked errors: {counts['locked']}"
+                )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def bench_signup(command, size, repeat):
+    """Registrations per second: one signup form at a time vs ``import_students`` of ``size`` rows."""
+    import os
+    from itertools import count
+
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from achievements.admissions import import_students
+    from achievements.forms import UserRegistrationForm
+
+    batches = count()
+
+    def rows(number, password='Adm1ssion-2025'):
+        batch = next(batches)
+        return [(line + 2, {
+            'username': f'student{batch}_{line}', 'email': f'student{batch}_{line}@example.com',
+            'first_name': 'New', 'last_name': f'Student {line}', 'roll_number': f'R{batch}-{line}',
+            'department': 'CSE', 'year': '2025', 'phone': '', 'password': password,
+        }) for line in range(number)]
+
+    def signups(number):
+        for _, row in rows(number):
+            form = UserRegistrationForm({**row, 'password1': row['password'], 'password2': row['password']})
+            assert form.is_valid(), form.errors
+            form.save()
+
+    form_count = max(1, size // 5)
+    workers = os.cpu_count() or 1
+    with scratch_database():
+        with CaptureQueriesContext(connection) as queries:
+            signups(1)
+        form_time, _ = timed(lambda: signups(form_count), repeat)
+        command.stdout.write(f"signup form: {form_count / form_time:.1f} registrations/s, "
+                             f"{len(queries)} queries per signup (including BEGIN/COMMIT)")
+        runs = [('import_students, 1 process', 'Adm1ssion-2025', 1)]
+        if workers > 1:
+            runs.append((f'import_students, {workers} processes', 'Adm1ssion-2025', workers))
+        runs.append(('import_students, no passwords (database work only)', '', 1))
+        for label, password, pool in runs:
+            elapsed, _ = timed(lambda: import_students(rows(size, password), workers=pool), repeat)
+            command.stdout.write(f"{label}: {size / elapsed:.1f} registrations/s")
+
+
+def bench_login(command, size, repeat):
+    """
+    Latency of ``size`` logins from 8 concurrent students while 4 threads guess
+    another account's password, per hasher profile, with and without throttling.
+    """
+    import statistics
+    import threading
+
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+    from django.core.cache import cache
+    from django.test import RequestFactory, override_settings
+
+    from achievements.throttling import throttled_authenticate
+    from student_blog.settings import password_hashers
+
+    students, attackers = 8, 4
+    unlimited = {name: {'capacity': 10 ** 9, 'per_minute': 10 ** 9} for name in ('ip', 'username')}
+    factory = RequestFactory()
+
+    def attempt(username, password, ip):
+        request = factory.post('/login/', REMOTE_ADDR=ip)
+        started = time.perf_counter()
+        user, retry_after = throttled_authenticate(request, username, password)
+        return time.perf_counter() - started, user, retry_after
+
+    with scratch_database():
+        User.objects.bulk_create([User(username=f'student{i}') for i in range(students)]
+                                 + [User(username='victim')])
+        for profile in ('pbkdf2', 'scrypt'):
+            with override_settings(PASSWORD_HASHERS=password_hashers(profile)):
+                # Store hashes made by this profile, so no login rehashes mid-run
+                User.objects.update(password=make_password('Term-start-2025'))
+                for label, throttle in (('unthrottled', unlimited), ('throttled', settings.LOGIN_THROTTLE)):
+                    with override_settings(LOGIN_THROTTLE=throttle):
+                        cache.clear()
+                        latencies, guesses, done = [], [], threading.Event()
+
+                        def student(i):
+                            for _ in range(size // students):
+                                elapsed, user, _ = attempt(f'student{i}', 'Term-start-2025', f'10.1.0.{i}')
+                                assert user is not None
+                                latencies.append(elapsed)
+
+                        def attacker(i):
+                            while not done.is_set():
+                                guesses.append(attempt('victim', f'guess-{i}-{len(guesses)}', '10.66.0.1')[2])
+                                time.sleep(0.001)  # a network round trip between guesses
+
+                        threads = [threading.Thread(target=attacker, args=(i,)) for i in range(attackers)]
+                        for thread in threads:
+                            thread.start()
+                        logins = [threading.Thread(target=student, args=(i,)) for i in range(students)]
+                        for thread in logins:
+                            thread.start()
+                        for thread in logins:
+                            thread.join()
+                        done.set()
+                        for thread in threads:
+                            thread.join()
+                        cache.clear()
+
+                    percentiles = statistics.quantiles(latencies, n=100)
+                    hashed = guesses.count(None)  # not refused, so the password was checked
+                    command.stdout.write(
+                        f"{profile:7} {label:12} p50 {percentiles[49] * 1000:7.0f} ms   "
+                        f"p99 {percentiles[98] * 1000:7.0f} ms   guesses hashed {hashed}/{len(guesses)}"
+                    )
+
+
+def bench_moderation(command, size, repeat):
+    """Approving ``size`` pending achievements: ``save()`` per row vs batched ``moderate``."""
+    from django.db import connection, transaction
+    from django.db.models.signals import post_save
+
+    from achievements.models import Achievement, ModerationLog
+    from achievements.moderation import achievements_moderated, moderate
+
+    def per_row(ids):
+        # What Achievement.approve() used to do, one transaction per click
+        for achievement in Achievement.objects.filter(pk__in=ids):
+            with transaction.atomic():
+                achievement.is_approved = True
+                achievement.save()
+
+    def batched(ids):
+        moderate(ids, ModerationLog.APPROVE)
+
+    with scratch_database():
+        synthetic_achievements(size)
+        ids = list(Achievement.objects.values_list('pk', flat=True))
+        for label, approve in (('save() per achievement (before)', per_row), ('moderate() batches', batched)):
+            best, queries, signals = float('inf'), [], []
+            receiver = lambda sender, **kwargs: signals.append(sender)
+
+            def count_query(execute, sql, params, many, context):
+                queries.append(sql)
+                return execute(sql, params, many, context)
+
+            post_save.connect(receiver, sender=Achievement, weak=False)
+            achievements_moderated.connect(receiver, weak=False)
+            try:
+                for _ in range(repeat):
+                    Achievement.objects.update(is_approved=False)
+                    ModerationLog.objects.all().delete()
+                    signals.clear()
+                    queries.clear()
+                    with connection.execute_wrapper(count_query):
+                        started = time.perf_counter()
+                        approve(ids)
+                        best = min(best, time.perf_counter() - started)
+            finally:
+                post_save.disconnect(receiver, sender=Achievement)
+                achievements_moderated.disconnect(receiver)
+            command.stdout.write(f"{label}: {size / best:.0f} achievements/s, {len(queries)} queries, "
+                                 f"{len(signals)} signals")
+
+
+SCENARIOS = {
+    'asgi': (bench_asgi, 600),
+    'cgpa-batch': (bench_cgpa_batch, 5000),
+    'db-writes': (bench_db_writes, 2000),
+    'fragments': (bench_fragments, 500),
+    'grade-lookup': (bench_grade_lookup, 500),
+    'login': (bench_login, 96),
+    'moderation': (bench_moderation, 2000),
+    'search': (bench_search, 100000),
+    'signup': (bench_signup, 100),
+    'stampede': (bench_stampede, 32),
+}
+
+
+class Command(BaseCommand):
+    help = "Run a named performance benchmark and print timings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', choices=sorted(SCENARIOS))
+        parser.add_argument('--size', type=int, help="Scenario size (students, rows, ...)")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement; best is reported")
+
+    def handle(self, *args, **options):
+        func, default_size = SCENARIOS[options['scenario']]
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1")
+        func(self, options['size'] or default_size, options['repeat'])
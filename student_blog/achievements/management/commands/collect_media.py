@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from achievements.storage import adopt_legacy_files, collect_garbage
+
+
+class Command(BaseCommand):
+    help = ("Delete content-addressed media blobs (and their thumbnails) that no achievement "
+            "or profile references any more.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report what would be deleted without deleting it")
+        parser.add_argument('--grace', type=int, default=3600,
+                            help="Keep unreferenced files younger than this many seconds (default: 3600)")
+        parser.add_argument('--adopt', action='store_true',
+                            help="First move files uploaded before content addressing into blobs")
+
+    def handle(self, *args, **options):
+        if options['adopt'] and not options['dry_run']:
+            updated, moved = adopt_legacy_files()
+            self.stdout.write(f"Moved {moved} legacy files into blobs ({updated} records updated). "
+                              "Run generate_thumbnails to rebuild their thumbnails.")
+
+        summary = collect_garbage(grace_seconds=options['grace'], dry_run=options['dry_run'])
+        verb = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {summary['scanned']} files for {summary['referenced_blobs']} referenced blobs "
+            f"({summary['shared_blobs']} shared). {verb} {summary['deleted']} orphaned files, "
+            f"{summary['bytes_freed'] / 1024:.0f} KB."
+        ))
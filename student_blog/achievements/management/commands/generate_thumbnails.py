@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from achievements.models import Achievement, thumbnail_path
+from achievements.thumbnails import THUMBNAIL_FORMATS, process_achievement
+
+
+class Command(BaseCommand):
+    help = ("Generate resized WebP/JPEG copies of uploaded achievement images that don't "
+            "have them yet, and report how much smaller the listing images get.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help="Regenerate thumbnails for every uploaded image")
+        parser.add_argument('--chunk-size', type=int, default=200,
+                            help="Achievements fetched per batch (default: 200)")
+
+    def handle(self, *args, **options):
+        pending = Achievement.objects.filter(image_available=True)
+        if not options['force']:
+            pending = pending.filter(thumbnail_widths__isnull=True)
+        pending = pending.only('id', 'image', 'image_size')
+
+        processed = skipped = 0
+        original_bytes = listing_bytes = 0
+        listing_ext = THUMBNAIL_FORMATS[0][0]
+        for achievement in pending.iterator(chunk_size=options['chunk_size']):
+            widths = process_achievement(achievement.pk)
+            if widths is None:
+                continue
+            processed += 1
+            if not widths:
+                skipped += 1  # already small, or unreadable
+                continue
+            # Cards are 80px wide, so a 2x screen picks the smallest copy
+            storage = achievement.image.storage
+            original_bytes += achievement.image_size or 0
+            listing_bytes += storage.size(thumbnail_path(achievement.image.name, widths[0], listing_ext))
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} images ({skipped} needed no thumbnails)."))
+        if listing_bytes:
+            self.stdout.write(
+                f"Listing images: {original_bytes / 1024:.0f} KB originals -> "
+                f"{listing_bytes / 1024:.0f} KB {listing_ext} thumbnails "
+                f"({original_bytes / listing_bytes:.0f}x smaller)"
+            )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from achievements.admissions import AdmissionsError, import_students, read_admissions_csv
+
+
+class Command(BaseCommand):
+    help = ("Register students from an admissions CSV with columns username, email, first_name, "
+            "last_name, roll_number and optionally department, year, phone and password. "
+            "Nothing is imported unless every row is valid.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help="Path to the CSV file (UTF-8, with a header row)")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Processes hashing passwords (default: one per CPU)")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as file:
+                rows = read_admissions_csv(file)
+            created = import_students(rows, workers=options['workers'])
+        except OSError as e:
+            raise CommandError(f"Could not read {options['csv_file']}: {e}")
+        except AdmissionsError as e:
+            for line, message in e.errors[:50]:
+                self.stderr.write(f"line {line}: {message}")
+            if len(e.errors) > 50:
+                self.stderr.write(f"... and {len(e.errors) - 50} more")
+            raise CommandError(f"Nothing imported: {len(e.errors)} errors.")
+        self.stdout.write(self.style.SUCCESS(f"Registered {created} students."))
@@ -0,0 +1,48 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from achievements.uploads import claim_next_job, process_job, queue_metrics, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = ("Worker for staged achievement image uploads: validate, re-encode, strip metadata "
+            "and move each image into place. Runs until interrupted unless --once is given.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Drain the queue and exit instead of polling")
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help="Seconds to sleep when the queue is empty (default: 2)")
+        parser.add_argument('--stats', action='store_true',
+                            help="Print queue depth and latency metrics as JSON and exit")
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(queue_metrics(), indent=2))
+            return
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale jobs.")
+
+        processed = 0
+        try:
+            while True:
+                job = claim_next_job()
+                if job is None:
+                    if options['once']:
+                        break
+                    close_old_connections()
+                    time.sleep(options['poll_interval'])
+                    continue
+                status = process_job(job)
+                processed += 1
+                latency = f" in {job.latency:.2f}s" if job.latency is not None else ''
+                self.stdout.write(f"Job {job.pk} ({job.original_name}): {status}{latency}")
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} upload jobs."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from achievements.search import fts_enabled, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the achievement full-text search index from the achievements table."
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            self.stdout.write(self.style.WARNING(
+                "Full-text index is only used on SQLite; searches use icontains on this database."
+            ))
+            return
+        indexed = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} achievements."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from achievements.grading import cohort_queryset, recompute_cohort_cgpa
+
+
+class Command(BaseCommand):
+    help = "Recompute and store CGPA for every student (or a filtered cohort) in one pass."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--department', help="Only students in this department")
+        parser.add_argument('--year', type=int, help="Only students in this academic year")
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help="Rows fetched and profiles written per batch (default: 500)")
+
+    def handle(self, *args, **options):
+        students = cohort_queryset(department=options['department'], year=options['year'])
+        summary = recompute_cohort_cgpa(students, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated CGPA for {summary['students_updated']} students in "
+            f"{summary['elapsed_seconds']}s ({summary['students_per_second']} students/s)"
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from achievements.grading import reconcile_grade_totals
+
+
+class Command(BaseCommand):
+    help = "Check stored semester/profile grade totals against a full recompute from course units."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true',
+                            help="Rewrite drifted totals with the recomputed values")
+
+    def handle(self, *args, **options):
+        stale = reconcile_grade_totals(fix=options['fix'])
+        if not stale['semesters'] and not stale['profiles']:
+            self.stdout.write(self.style.SUCCESS("All stored grade totals match."))
+            return
+
+        verb = "Fixed" if options['fix'] else "Found"
+        self.stdout.write(self.style.WARNING(
+            f"{verb} {len(stale['semesters'])} semester(s) and "
+            f"{len(stale['profiles'])} profile(s) with drifted totals."
+        ))
+        if stale['profiles']:
+            self.stdout.write(f"Affected user ids: {', '.join(map(str, stale['profiles'][:20]))}"
+                              + (" ..." if len(stale['profiles']) > 20 else ""))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from achievements.stats import refresh_dashboard_snapshot
+
+
+class Command(BaseCommand):
+    help = ("Store the staff dashboard counters as a snapshot. Schedule it (e.g. every few "
+            "minutes from cron) and set ADMIN_DASHBOARD_SNAPSHOT_MAX_AGE to serve from it.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep', type=int, default=48,
+                            help="Number of most recent snapshots to keep (default: 48)")
+
+    def handle(self, *args, **options):
+        snapshot = refresh_dashboard_snapshot(keep=max(options['keep'], 1))
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot saved: {snapshot.student_count} students, {snapshot.staff_count} staff, "
+            f"{snapshot.achievement_count} achievements ({snapshot.pending_approvals} pending)."
+        ))
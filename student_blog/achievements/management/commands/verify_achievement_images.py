@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from achievements.models import Achievement
+from achievements.stats import invalidate_home_stats
+
+METADATA_FIELDS = ['image_available', 'image_width', 'image_height', 'image_size']
+
+
+class Command(BaseCommand):
+    help = ("Re-check uploaded achievement images against storage: record metadata for files "
+            "that exist and mark missing files unavailable.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help="Achievements fetched and written per batch (default: 500)")
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        with_images = (Achievement.objects.exclude(image='').exclude(image__isnull=True)
+                       .only('id', 'image', *METADATA_FIELDS))
+
+        checked = missing = changed = 0
+        pending = []
+        for achievement in with_images.iterator(chunk_size=chunk_size):
+            checked += 1
+            before = [getattr(achievement, field) for field in METADATA_FIELDS]
+            if achievement.image.storage.exists(achievement.image.name):
+                achievement.record_image_metadata()
+            else:
+                missing += 1
+                achievement.clear_image_metadata()
+            if [getattr(achievement, field) for field in METADATA_FIELDS] != before:
+                achievement.updated_at = timezone.now()  # re-keys its cached card
+                pending.append(achievement)
+            if len(pending) >= chunk_size:
+                changed += Achievement.objects.bulk_update(pending, [*METADATA_FIELDS, 'updated_at'])
+                pending = []
+        if pending:
+            changed += Achievement.objects.bulk_update(pending, [*METADATA_FIELDS, 'updated_at'])
+        if changed:
+            invalidate_home_stats()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} images: {missing} missing, {changed} records updated."
+        ))
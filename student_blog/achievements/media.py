@@ -0,0 +1,185 @@
+"""
+Serving uploaded media through Django, for production as well as DEBUG.
+
+Only files that a record points at are served: an achievement image (or one
+of its thumbnails) is public once the achievement is approved and otherwise
+visible to its owner and to staff; avatars are public. Everything else under
+MEDIA_ROOT, including the upload staging area, is a 404. Blobs and their
+thumbnails are matched to records through the indexed ``image_digest`` and
+``avatar_digest`` columns; only files outside content-addressed storage are
+looked up by name.
+
+Responses carry ETag/Last-Modified and answer If-None-Match/If-Modified-Since
+with 304, and single byte ranges with 206. With ``MEDIA_SENDFILE`` set to
+'x-sendfile' (Apache) or 'x-accel-redirect' (nginx) the web server sends the
+file body; otherwise ``FileResponse`` streams the open file, which gunicorn
+and uWSGI hand to ``os.sendfile`` through ``wsgi.file_wrapper``.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.db.models import Count, Q
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+from .models import Achievement, StudentProfile
+from .storage import blob_hash
+
+# thumbnail_path() suffix: <base>.w320.webp
+DERIVATIVE_SUFFIX = re.compile(r'^(?P<base>.+)\.w\d+\.[a-z]+$')
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Short enough that an un-approved image drops out of shared caches within a day
+PUBLIC_MAX_AGE = 60 * 60 * 24
+
+
+def _source_filter(field, name):
+    """Q matching records whose ``field`` is ``name`` or the file ``name`` was derived from."""
+    digest = blob_hash(name)
+    if digest:
+        # An exact match on the indexed digest column, which the model keeps in step with the file
+        return Q(**{f'{field}_digest': digest})
+    derivative = DERIVATIVE_SUFFIX.match(name)
+    if derivative:
+        return Q(**{field: name}) | Q(**{f'{field}__startswith': derivative['base'] + '.'})
+    return Q(**{field: name})
+
+
+def media_visibility(user, name):
+    """
+    'public' if anyone may see the file ``name``, 'private' if only ``user``
+    may (the owner or staff), or None if it must not be served to ``user``.
+    """
+    references = Achievement.objects.filter(_source_filter('image', name)).aggregate(
+        total=Count('id'),
+        approved=Count('id', filter=Q(is_approved=True)),
+        owned=Count('id', filter=Q(student_id=user.pk)),
+    )
+    if references['approved']:
+        return 'public'
+    if StudentProfile.objects.filter(_source_filter('avatar', name)).exists():
+        return 'public'
+    if references['total'] and (references['owned'] or user.is_staff):
+        return 'private'
+    return None
+
+
+class _RangeFile:
+    """Read at most ``length`` bytes of ``file`` from its current position."""
+
+    def __init__(self, file, length):
+        self.file, self.remaining = file, length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _byte_range(request, size, etag, last_modified):
+    """
+    ``(start, end)`` of the single range requested, None to send the whole
+    file, or 'unsatisfiable'. Multiple ranges and stale If-Range get the
+    whole file, which HTTP allows.
+    """
+    header = request.META.get('HTTP_RANGE', '')
+    match = RANGE_HEADER.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range not in (etag, http_date(last_modified)):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:  # bytes=-N: the last N bytes
+        start, end = max(0, size - int(last)), size - 1
+    if start >= size or start > end:
+        return 'unsatisfiable'
+    return start, end
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve one file from MEDIA_ROOT if the requesting user may see it."""
+    name = path.replace('\\', '/')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404("No such file.")
+    if not os.path.isfile(full_path):
+        raise Http404("No such file.")
+    visibility = media_visibility(request.user, name)
+    if visibility is None:
+        raise Http404("No such file.")
+
+    stat = os.stat(full_path)
+    digest = blob_hash(name)
+    if digest and os.path.splitext(os.path.basename(name))[0] == digest:
+        etag = quote_etag(digest)  # the name is the content hash
+    else:
+        etag = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+    last_modified = int(stat.st_mtime)
+
+    def finish(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Accept-Ranges'] = 'bytes'
+        response['X-Content-Type-Options'] = 'nosniff'
+        if visibility == 'public':
+            patch_cache_control(response, public=True, max_age=PUBLIC_MAX_AGE)
+        else:
+            patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+            response['Vary'] = 'Cookie'
+        return response
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return finish(not_modified)
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    sendfile = getattr(settings, 'MEDIA_SENDFILE', None)
+    if sendfile:
+        # The web server reads the file and handles Range itself
+        response = HttpResponse(content_type=content_type)
+        if sendfile == 'x-accel-redirect':
+            prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+            # nginx decodes the URI, so names with spaces or non-ASCII characters must be quoted
+            response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(name)
+        else:
+            response['X-Sendfile'] = full_path
+        return finish(response)
+
+    byte_range = _byte_range(request, stat.st_size, etag, last_modified)
+    if byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return finish(response)
+
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        return finish(FileResponse(file, content_type=content_type))
+
+    start, end = byte_range
+    file.seek(start)
+    length = end - start + 1
+    # Open-ended ranges stream the real file so os.sendfile still applies
+    body = file if end == stat.st_size - 1 else _RangeFile(file, length)
+    response = FileResponse(body, status=206, content_type=content_type)
+    response['Content-Length'] = length
+    response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    return finish(response)
@@ -0,0 +1,91 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:39
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+
+# Frozen copy of the grade points when this migration was written; later
+# changes to the live grade table must not change what it backfilled.
+GRADE_POINTS = {
+    "A+": Decimal("5.0"),
+    "A": Decimal("5.0"),
+    "B+": Decimal("4.5"),
+    "B": Decimal("4.0"),
+    "C+": Decimal("3.5"),
+    "C": Decimal("3.0"),
+    "D+": Decimal("2.5"),
+    "D": Decimal("2.0"),
+    "E+": Decimal("1.5"),
+    "E-": Decimal("1.0"),
+    "F": Decimal("0.0"),
+}
+
+
+def grade_points(grade):
+    points = GRADE_POINTS.get(grade)
+    if points is None:
+        points = GRADE_POINTS.get(grade.upper().strip(), Decimal(0))
+    return points
+
+
+def cgpa(points, credits):
+    value = round(float(points) / float(credits), 2) if credits > 0 else 0.0
+    return Decimal(str(value)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def backfill_running_totals(apps, schema_editor):
+    Semester = apps.get_model("achievements", "Semester")
+    StudentProfile = apps.get_model("achievements", "StudentProfile")
+
+    student_totals = {}
+    for semester in Semester.objects.prefetch_related("course_units"):
+        points = credits = Decimal(0)
+        for unit in semester.course_units.all():
+            if unit.grade:
+                points += grade_points(unit.grade) * unit.credits
+                credits += unit.credits
+        semester.quality_points, semester.graded_credits = points, credits
+        semester.save(update_fields=["quality_points", "graded_credits"])
+        totals = student_totals.setdefault(
+            semester.student_id, [Decimal(0), Decimal(0)]
+        )
+        totals[0] += points
+        totals[1] += credits
+
+    for profile in StudentProfile.objects.filter(user_id__in=student_totals):
+        points, credits = student_totals[profile.user_id]
+        profile.total_quality_points = points
+        profile.total_credits = credits
+        profile.cgpa = cgpa(points, credits)
+        profile.save(update_fields=["total_quality_points", "total_credits", "cgpa"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("achievements", "0007_studentprofile_cgpa_studentprofile_total_credits"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="semester",
+            name="graded_credits",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=6),
+        ),
+        migrations.AddField(
+            model_name="semester",
+            name="quality_points",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=7),
+        ),
+        migrations.AddField(
+            model_name="studentprofile",
+            name="total_quality_points",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Sum of credits x grade points over graded units",
+                max_digits=8,
+            ),
+        ),
+        migrations.RunPython(backfill_running_totals, migrations.RunPython.noop),
+    ]
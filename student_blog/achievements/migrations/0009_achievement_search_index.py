@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:10
+
+from django.db import migrations
+
+FTS_TABLE = "achievements_achievement_fts"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "name, event, competition, description, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, name, event, competition, description) "
+        "SELECT id, name, event, competition, COALESCE(description, '') "
+        "FROM achievements_achievement"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("achievements", "0008_course_unit_running_totals"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
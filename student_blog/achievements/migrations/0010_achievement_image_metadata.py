@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:51
+
+from django.core.files.images import get_image_dimensions
+from django.db import migrations, models
+
+
+def record_existing_images(apps, schema_editor):
+    Achievement = apps.get_model("achievements", "Achievement")
+    for achievement in Achievement.objects.exclude(image="").exclude(image__isnull=True):
+        storage = achievement.image.storage
+        if not storage.exists(achievement.image.name):
+            continue
+        achievement.image_size = storage.size(achievement.image.name)
+        with storage.open(achievement.image.name) as image_file:
+            achievement.image_width, achievement.image_height = get_image_dimensions(image_file)
+        achievement.image_available = True
+        achievement.save(
+            update_fields=["image_available", "image_width", "image_height", "image_size"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("achievements", "0009_achievement_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="achievement",
+            name="image_available",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name="achievement",
+            name="image_height",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="achievement",
+            name="image_size",
+            field=models.PositiveIntegerField(
+                blank=True,
+                editable=False,
+                help_text="Image file size in bytes",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="achievement",
+            name="image_width",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(record_existing_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("achievements", "0010_achievement_image_metadata"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="achievement",
+            name="thumbnail_widths",
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("achievements", "0011_achievement_thumbnails"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageUploadJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "staged_name",
+                    models.CharField(
+                        help_text="Staged file, relative to MEDIA_ROOT", max_length=255
+                    ),
+                ),
+                ("original_name", models.CharField(blank=True, max_length=255)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processing", "Processing"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "achievement",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upload_jobs",
+                        to="achievements.achievement",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Image Upload Job",
+                "verbose_name_plural": "Image Upload Jobs",
+                "ordering": ["created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="achievement_status_f05952_idx",
+                    )
+                ],
+            },
+        ),
+    ]
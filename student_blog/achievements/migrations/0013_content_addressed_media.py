@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:58
+
+import achievements.models
+import achievements.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("achievements", "0012_image_upload_job"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="achievement",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                help_text="Upload achievement image or certificate",
+                null=True,
+                storage=achievements.storage.ContentAddressedStorage(),
+                upload_to=achievements.models.achievement_image_path,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="studentprofile",
+            name="avatar",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=achievements.storage.ContentAddressedStorage(),
+                upload_to="avatars/",
+            ),
+        ),
+    ]
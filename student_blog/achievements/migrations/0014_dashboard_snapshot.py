@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:03
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("achievements", "0013_content_addressed_media"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DashboardSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("student_count", models.PositiveIntegerField(default=0)),
+                ("staff_count", models.PositiveIntegerField(default=0)),
+                ("achievement_count", models.PositiveIntegerField(default=0)),
+                ("pending_approvals", models.PositiveIntegerField(default=0)),
+                ("approved_achievements", models.PositiveIntegerField(default=0)),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Dashboard Snapshot",
+                "verbose_name_plural": "Dashboard Snapshots",
+                "ordering": ["-created_at"],
+                "get_latest_by": "created_at",
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-17 03:01
+
+import os
+
+from django.db import migrations, models
+
+HASH_LENGTH = 64
+
+
+def digest_of(name):
+    """The SHA-256 a ``blobs/...`` file name starts with, or ''."""
+    if not name or not name.startswith("blobs/"):
+        return ""
+    digest = os.path.basename(name)[:HASH_LENGTH]
+    if len(digest) == HASH_LENGTH and all(c in "0123456789abcdef" for c in digest):
+        return digest
+    return ""
+
+
+def record_digests(apps, schema_editor):
+    for model_name, field, digest_field in [
+        ("Achievement", "image", "image_digest"),
+        ("StudentProfile", "avatar", "avatar_digest"),
+    ]:
+        model = apps.get_model("achievements", model_name)
+        rows = model.objects.filter(**{f"{field}__startswith": "blobs/"})
+        for pk, name in list(rows.values_list("pk", field)):
+            model.objects.filter(pk=pk).update(**{digest_field: digest_of(name)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("achievements", "0015_moderation_log"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="achievement",
+            name="image_digest",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=64
+            ),
+        ),
+        migrations.AddField(
+            model_name="studentprofile",
+            name="avatar_digest",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=64
+            ),
+        ),
+        migrations.RunPython(record_digests, migrations.RunPython.noop),
+    ]
@@ -1,20 +1,48 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 import os
 
+from .storage import blob_hash, media_storage
+
 def achievement_image_path(instance, filename):
     """
-    Generate file path for achievement images
-    File will be uploaded to: MEDIA_ROOT/achievements/user_<id>/<filename>
+    Upload path for achievement images. media_storage names each file after
+    the SHA-256 of its content and keeps only the extension given here.
+    """
+    return f'achievements/upload{os.path.splitext(filename)[1]}'
+
+def thumbnail_path(name, width, ext):
+    """
+    Path of a resized copy of an uploaded image, stored next to the original:
+    blobs/3f/a9/3fa9...e1.png -> blobs/3f/a9/3fa9...e1.w320.webp
+    """
+    return f'{os.path.splitext(name)[0]}.w{width}.{ext}'
+
+def commit_blob(file):
+    """
+    Store a new upload now rather than in ``Model.save``, so its
+    content-addressed name is known, and return its digest ('' for none).
     """
-    # Get file extension
-    ext = filename.split('.')[-1]
-    # Generate filename: achievement_<id>_<timestamp>.<ext>
-    filename = f'achievement_{instance.id}_{int(timezone.now().timestamp())}.{ext}'
-    return os.path.join('achievements', f'user_{instance.student.id}', filename)
+    if not file:
+        return ''
+    if not file._committed:
+        file.save(file.name, file.file, save=False)
+    return blob_hash(file.name) or ''
+
+
+def with_digest_field(kwargs, field, digest_field):
+    """``save`` kwargs that also write ``digest_field`` whenever ``field`` is written."""
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and field in update_fields and digest_field not in update_fields:
+        kwargs = {**kwargs, 'update_fields': [*update_fields, digest_field]}
+    return kwargs
+
 
 class StudentProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='studentprofile')
@@ -22,7 +50,9 @@ class StudentProfile(models.Model):
     department = models.CharField(max_length=100, default="Computer Science & Engineering")
     year = models.IntegerField(default=2025)
     phone = models.CharField(max_length=15, blank=True, null=True)
-    avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    avatar = models.ImageField(upload_to='avatars/', storage=media_storage, blank=True, null=True)
+    # Content hash of the avatar blob, so serving a file finds its owner by an indexed lookup
+    avatar_digest = models.CharField(max_length=64, blank=True, default='', db_index=True, editable=False)
     bio = models.TextField(blank=True, null=True)
     is_student = models.BooleanField(default=True)
     created_at = models.DateTimeField(default=timezone.now)
@@ -31,6 +61,8 @@ class StudentProfile(models.Model):
                                help_text="Saved overall CGPA for the student")
     total_credits = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True,
                                         help_text="Total recorded credits used in CGPA calculation")
+    total_quality_points = models.DecimalField(max_digits=8, decimal_places=2, default=0,
+                                               help_text="Sum of credits x grade points over graded units")
 
     
     class Meta:
@@ -49,6 +81,85 @@ class StudentProfile(models.Model):
     def email(self):
         return self.user.email
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_saved_state()
+        return instance
+
+    def _field_state(self):
+        deferred = self.get_deferred_fields()
+        state = {}
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred:
+                continue
+            value = getattr(self, field.attname)
+            # A new upload has the same kind of value as a stored file, but isn't committed
+            state[field.attname] = (value.name, value._committed) if isinstance(value, FieldFile) else value
+        return state
+
+    def _remember_saved_state(self, fields=None):
+        state = self._field_state()
+        if fields is None or not hasattr(self, '_saved_state'):
+            self._saved_state = state
+        else:
+            for name in fields:
+                attname = self._meta.get_field(name).attname
+                self._saved_state[attname] = state[attname]
+
+    def dirty_fields(self):
+        """
+        Names of the fields changed since the profile was loaded or last
+        saved, or None if it wasn't loaded from the database.
+        """
+        saved = getattr(self, '_saved_state', None)
+        if saved is None:
+            return None
+        current = self._field_state()
+        return [field.name for field in self._meta.concrete_fields
+                if field.attname in saved and current.get(field.attname) != saved[field.attname]]
+
+    def save(self, *args, **kwargs):
+        """
+        Write only the fields that changed since the profile was loaded, or
+        nothing if none did. New profiles and saves with explicit
+        ``update_fields`` go through as usual.
+        """
+        self.avatar_digest = commit_blob(self.avatar)
+        kwargs = with_digest_field(kwargs, 'avatar', 'avatar_digest')
+        if not self._state.adding and not args and not kwargs.get('force_insert') and 'update_fields' not in kwargs:
+            dirty = self.dirty_fields()
+            if dirty == []:
+                return
+            if dirty is not None:
+                kwargs['update_fields'] = [*dirty, 'updated_at']
+        super().save(*args, **kwargs)
+        self._remember_saved_state(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._remember_saved_state(fields)
+
+    def refresh_cgpa(self):
+        """Recompute ``cgpa`` from the stored running totals."""
+        self.cgpa = to_two_places(cgpa_from_totals(
+            float(self.total_quality_points or 0), float(self.total_credits or 0)
+        ))
+
+class AchievementQuerySet(models.QuerySet):
+    # Everything an achievement card renders, including the student's name and roll number
+    CARD_FIELDS = (
+        'id', 'name', 'event', 'prize', 'competition', 'image', 'image_url', 'image_available',
+        'image_width', 'thumbnail_widths',
+        'description', 'date_achieved', 'created_at', 'updated_at', 'is_approved',
+        'student__username', 'student__first_name', 'student__last_name',
+        'student__studentprofile__roll_number',
+    )
+
+    def for_cards(self):
+        """Join the student and profile into the same query and skip unused columns."""
+        return self.select_related('student__studentprofile').only(*self.CARD_FIELDS)
+
 class Achievement(models.Model):
     COMPETITION_LEVELS = [
         ('college', 'College Level'),
@@ -65,16 +176,30 @@ class Achievement(models.Model):
     competition = models.CharField(max_length=50, choices=COMPETITION_LEVELS, default='college')
     image = models.ImageField(
         upload_to=achievement_image_path,
+        storage=media_storage,
         blank=True, 
         null=True, 
         help_text="Upload achievement image or certificate"
     )
+    # Content hash of the image blob, so serving a file finds its record by an indexed lookup
+    image_digest = models.CharField(max_length=64, blank=True, default='', db_index=True, editable=False)
     image_url = models.URLField(blank=True, null=True, help_text="Or provide image URL")    
+    # Recorded once when the image is uploaded, and re-checked by verify_achievement_images,
+    # so rendering a card never has to touch storage
+    image_available = models.BooleanField(default=False, editable=False)
+    image_width = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    image_height = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    image_size = models.PositiveIntegerField(blank=True, null=True, editable=False,
+                                             help_text="Image file size in bytes")
+    # Widths generated by achievements.thumbnails; None until the upload has been processed
+    thumbnail_widths = models.JSONField(blank=True, null=True, editable=False)
     description = models.TextField(blank=True, null=True)
     date_achieved = models.DateField(default=timezone.now)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     is_approved = models.BooleanField(default=False)
+
+    objects = AchievementQuerySet.as_manager()
     
     class Meta:
         verbose_name = "Achievement"
@@ -103,29 +228,66 @@ class Achievement(models.Model):
     def competition_level_display(self):
         return dict(self.COMPETITION_LEVELS).get(self.competition, self.competition)
     
-    def approve(self):
-        self.is_approved = True
-        self.save()
+    def approve(self, moderator=None, note=''):
+        self._moderate(ModerationLog.APPROVE, moderator, note)
     
-    def disapprove(self):
-        self.is_approved = False
-        self.save()
+    def disapprove(self, moderator=None, note=''):
+        self._moderate(ModerationLog.REJECT, moderator, note)
+
+    def _moderate(self, action, moderator, note):
+        # Through the moderation service, so it is logged like a bulk action
+        from .moderation import moderate
+        if moderate([self.pk], action, moderator=moderator, note=note):
+            self.is_approved = action == ModerationLog.APPROVE
     
-    def get_image_url(self):
-        """Return either uploaded image URL or external image URL"""
+    def save(self, *args, **kwargs):
+        if not self.image:
+            self.clear_image_metadata()
+        elif not self.image._committed:
+            # A new upload: read size and dimensions from the file in hand
+            self.record_image_metadata()
+            self.thumbnail_widths = None
+        self.image_digest = commit_blob(self.image)
+        super().save(*args, **with_digest_field(kwargs, 'image', 'image_digest'))
+
+    def record_image_metadata(self):
+        """Store that the image file exists, with its size and dimensions."""
         try:
-            if self.image and hasattr(self.image, 'url'):
-            # Check if file actually exists
-                if self.image.storage.exists(self.image.name):
-                     return self.image.url
-                else:
-                    return None
-            elif self.image_url:
-                return self.image_url
-            return None
-        except Exception as e:
-        # Fallback to image_url if there's any error
-            return self.image_url
+            self.image_size = self.image.size
+            self.image_width, self.image_height = self.image.width, self.image.height
+            self.image_available = True
+        except (OSError, ValueError):
+            self.clear_image_metadata()
+
+    def clear_image_metadata(self):
+        self.image_available = False
+        self.image_width = self.image_height = self.image_size = None
+        self.thumbnail_widths = None
+    
+    def get_image_url(self):
+        """Return either uploaded image URL or external image URL, without any file I/O"""
+        if self.image and self.image_available:
+            return self.image.url
+        return self.image_url or None
+
+    def get_image_srcset(self, ext):
+        """``srcset`` candidates for the uploaded image in one format, smallest first."""
+        if not (self.image and self.image_available and self.thumbnail_widths):
+            return ''
+        storage = self.image.storage
+        candidates = [f'{storage.url(thumbnail_path(self.image.name, width, ext))} {width}w'
+                      for width in self.thumbnail_widths]
+        if ext != 'webp' and self.image_width:
+            candidates.append(f'{self.image.url} {self.image_width}w')
+        return ', '.join(candidates)
+
+    @property
+    def image_srcset(self):
+        return self.get_image_srcset('jpg')
+
+    @property
+    def image_srcset_webp(self):
+        return self.get_image_srcset('webp')
 
 class ContactMessage(models.Model):
     name = models.CharField(max_length=100)
@@ -143,9 +305,100 @@ class ContactMessage(models.Model):
     def __str__(self):
         return f"{self.name} - {self.subject}"
 
+class ImageUploadJob(models.Model):
+    """An uploaded achievement image waiting for the process_uploads worker."""
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    achievement = models.ForeignKey(Achievement, on_delete=models.CASCADE, related_name='upload_jobs')
+    staged_name = models.CharField(max_length=255, help_text="Staged file, relative to MEDIA_ROOT")
+    original_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Image Upload Job"
+        verbose_name_plural = "Image Upload Jobs"
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.original_name or self.staged_name} ({self.status})"
+
+    @property
+    def latency(self):
+        """Seconds from upload to the image being in place, once finished."""
+        if self.finished_at:
+            return (self.finished_at - self.created_at).total_seconds()
+        return None
+
+class DashboardSnapshot(models.Model):
+    """Staff dashboard counters, materialized by ``manage.py refresh_dashboard_stats``."""
+    student_count = models.PositiveIntegerField(default=0)
+    staff_count = models.PositiveIntegerField(default=0)
+    achievement_count = models.PositiveIntegerField(default=0)
+    pending_approvals = models.PositiveIntegerField(default=0)
+    approved_achievements = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = "Dashboard Snapshot"
+        verbose_name_plural = "Dashboard Snapshots"
+        ordering = ['-created_at']
+        get_latest_by = 'created_at'
+
+    def __str__(self):
+        return f"Dashboard stats at {self.created_at:%Y-%m-%d %H:%M}"
+
+class ModerationLog(models.Model):
+    """One approval or rejection, written by ``moderation.moderate``. Never edited."""
+    APPROVE = 'approve'
+    REJECT = 'reject'
+    ACTION_CHOICES = [
+        (APPROVE, 'Approved'),
+        (REJECT, 'Rejected'),
+    ]
+
+    # Kept when the achievement is deleted, so the log stays complete
+    achievement = models.ForeignKey(Achievement, on_delete=models.SET_NULL, null=True,
+                                    related_name='moderation_log')
+    achievement_name = models.CharField(max_length=200)
+    moderator = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                  related_name='moderation_log')
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    note = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = "Moderation Log Entry"
+        verbose_name_plural = "Moderation Log"
+        ordering = ['-created_at', '-id']
+
+    def __str__(self):
+        return f"{self.get_action_display()} {self.achievement_name}"
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
-    if created:
+    if created and getattr(instance, 'pending_profile', None) is not None:
+        # Signup attached the real profile: save it instead of a placeholder
+        instance.pending_profile.user = instance
+        instance.pending_profile.save(force_insert=True)
+        del instance.pending_profile
+    elif created:
         try:
             # Generate a default roll number if not provided during signup
             StudentProfile.objects.create(
@@ -157,16 +410,50 @@ def create_user_profile(sender, instance, created, **kwargs):
         except Exception as e:
             print(f"Error creating profile for user {instance.username}: {e}")
 
+def _user_name(user):
+    # None while either field is deferred: reading it would cost a query
+    if 'first_name' in user.__dict__ and 'last_name' in user.__dict__:
+        return user.first_name, user.last_name
+    return None
+
+@receiver(post_init, sender=User)
+def remember_user_name(sender, instance, **kwargs):
+    # The name as loaded, compared on save to spot a rename without asking the database
+    instance._loaded_name = _user_name(instance)
+
+@receiver(pre_save, sender=User)
+def note_user_rename(sender, instance, update_fields=None, **kwargs):
+    # post_save receivers read _renamed; a name that can't be compared counts as changed
+    if update_fields is not None and not {'first_name', 'last_name'} & set(update_fields):
+        instance._renamed = False
+        return
+    name, loaded_name = _user_name(instance), instance.__dict__.get('_loaded_name')
+    instance._renamed = name is None or loaded_name is None or name != loaded_name
+    instance._loaded_name = name
+
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, 'studentprofile'):
-        instance.studentprofile.save()
+def save_user_profile(sender, instance, created, **kwargs):
+    # A new user's profile was written by create_user_profile just now. Otherwise
+    # only a profile loaded through the user can have unsaved changes, and its
+    # save() writes nothing unless it does.
+    if created:
+        return
+    profile = User.studentprofile.related.get_cached_value(instance, default=None)
+    if profile is not None:
+        profile.save()
+    if getattr(instance, '_renamed', True):
+        # The profile's updated_at stands in for the user's, which has none: the
+        # API's ETag follows it, as its bodies show the student's name
+        StudentProfile.objects.filter(user=instance).update(updated_at=timezone.now())
 
 #### grading 
 
 
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings # Use settings.AUTH_USER_MODEL for student
+from decimal import Decimal
+
+from .cgpa_calculator import GRADE_CHOICES, cgpa_from_totals, get_quality_points, to_two_places
 
 
 
@@ -181,21 +468,24 @@ class Semester(models.Model):
         max_length=50, 
         help_text="e.g., 'Semester 1', 'Year 2 Semester 1'"
     )
+    # Running totals over graded units, maintained by the CourseUnit signals
+    quality_points = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    graded_credits = models.DecimalField(max_digits=6, decimal_places=2, default=0)
     
     def __str__(self):
         return f"{self.student.username} - {self.name}"
 
+    @property
+    def gpa(self):
+        if self.graded_credits > 0:
+            return float(self.quality_points) / float(self.graded_credits)
+        return 0.0
+
 class CourseUnit(models.Model):
     
     
 
-    GRADE_CHOICES = [
-        ('A+', 'A+ (5.0)'), ('A', 'A (5.0)'), 
-        ('B+', 'B+ (4.5)'), ('B', 'B (4.0)'), 
-        ('C+', 'C+ (3.5)'), ('C', 'C (3.0)'),
-        ('D+', 'D+ (2.5)'), ('D', 'D (2.0)'), ('E+', 'E+ (1.5)'),('E-', 'E- (1.0)'),
-        ('F', 'F (0.0)')
-    ]
+    GRADE_CHOICES = GRADE_CHOICES
     
     semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name='course_units')
     unit_name = models.CharField(max_length=100)
@@ -208,3 +498,57 @@ class CourseUnit(models.Model):
     def __str__(self):
         return f"{self.unit_name} ({self.semester.name})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_contribution()
+        return instance
+
+    def _remember_contribution(self):
+        self._saved_contribution = (self.semester_id, *self.contribution())
+
+    def contribution(self):
+        """``(quality_points, credits)`` this unit adds to its semester totals."""
+        if not self.grade or self.credits is None:
+            return Decimal(0), Decimal(0)
+        credits = Decimal(str(self.credits))
+        return Decimal(str(get_quality_points(self.grade))) * credits, credits
+
+
+def apply_grade_delta(semester_id, points, credits):
+    """Add a quality point/credit delta to a semester and its student's profile."""
+    if not points and not credits:
+        return
+    with transaction.atomic():
+        Semester.objects.filter(pk=semester_id).update(
+            quality_points=F('quality_points') + points,
+            graded_credits=F('graded_credits') + credits,
+        )
+        profiles = StudentProfile.objects.filter(user__semesters=semester_id)
+        profiles.update(
+            total_quality_points=F('total_quality_points') + points,
+            total_credits=Coalesce(F('total_credits'), Decimal(0)) + credits,
+        )
+        for profile in profiles.select_for_update().only('total_quality_points', 'total_credits'):
+            profile.refresh_cgpa()
+            StudentProfile.objects.filter(pk=profile.pk).update(cgpa=profile.cgpa)
+
+
+@receiver(post_save, sender=CourseUnit)
+def add_course_unit_to_totals(sender, instance, created, **kwargs):
+    old = getattr(instance, '_saved_contribution', None)
+    points, credits = instance.contribution()
+    if old and old[0] != instance.semester_id:
+        apply_grade_delta(old[0], -old[1], -old[2])
+    elif old:
+        points, credits = points - old[1], credits - old[2]
+    apply_grade_delta(instance.semester_id, points, credits)
+    instance._remember_contribution()
+
+
+@receiver(post_delete, sender=CourseUnit)
+def remove_course_unit_from_totals(sender, instance, **kwargs):
+    old = getattr(instance, '_saved_contribution', None)
+    semester_id, points, credits = old or (instance.semester_id, *instance.contribution())
+    apply_grade_delta(semester_id, -points, -credits)
+
@@ -0,0 +1,88 @@
+"""
+Approving and rejecting achievements in bulk.
+
+``moderate`` works through the ids ``batch_size`` at a time, each batch in
+its own transaction: one UPDATE of the rows whose status actually changes
+and one ``bulk_create`` of ``ModerationLog`` entries saying who changed them.
+Neither sends per-row signals. Instead each batch sends
+``achievements_moderated`` once it has committed, with the ids it changed,
+so receivers (the cached home page figures, for one) do their work once per
+batch rather than once per achievement.
+
+Changed rows get a new ``updated_at``, which is part of the cached card
+fragment keys, so cards drop out of the fragment cache on their own.
+
+``pending_page`` feeds the staff moderation queue: achievements never
+approved or rejected, oldest first, paged by id.
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Achievement, ModerationLog
+
+BATCH_SIZE = 500
+QUEUE_PAGE_SIZE = 10
+
+# Sent with achievement_ids, action (ModerationLog.APPROVE or REJECT) and moderator
+achievements_moderated = Signal()
+
+
+def moderate(achievement_ids, action, moderator=None, note='', batch_size=BATCH_SIZE):
+    """
+    Approve or reject the given achievements, logging each one that changes.
+    Ids already in the requested state, or no longer existing, are skipped;
+    rejecting a pending achievement counts as a change, though it was never
+    approved. Returns the number changed.
+    """
+    if action not in (ModerationLog.APPROVE, ModerationLog.REJECT):
+        raise ValueError(f"Unknown moderation action: {action!r}")
+    approve = action == ModerationLog.APPROVE
+    already_done = Q(is_approved=True) if approve else Q(_moderated(), is_approved=False)
+    ids = list(dict.fromkeys(achievement_ids))
+    changed = 0
+    for start in range(0, len(ids), batch_size):
+        with transaction.atomic():
+            rows = list(Achievement.objects.select_for_update()
+                        .filter(pk__in=ids[start:start + batch_size])
+                        .exclude(already_done)
+                        .order_by().values_list('pk', 'name'))
+            if not rows:
+                continue
+            changed_ids = [pk for pk, _ in rows]
+            now = timezone.now()
+            Achievement.objects.filter(pk__in=changed_ids).update(is_approved=approve, updated_at=now)
+            ModerationLog.objects.bulk_create([
+                ModerationLog(achievement_id=pk, achievement_name=name, moderator=moderator,
+                              action=action, note=note, created_at=now)
+                for pk, name in rows
+            ])
+            transaction.on_commit(partial(achievements_moderated.send, sender=Achievement,
+                                          achievement_ids=changed_ids, action=action,
+                                          moderator=moderator))
+        changed += len(rows)
+    return changed
+
+
+def _moderated():
+    return Exists(ModerationLog.objects.filter(achievement=OuterRef('pk')))
+
+
+def pending_achievements():
+    """Unapproved achievements that no one has moderated yet, oldest first."""
+    return (Achievement.objects.filter(is_approved=False).exclude(_moderated())
+            .for_cards().order_by('id'))
+
+
+def pending_page(after=None, page_size=QUEUE_PAGE_SIZE):
+    """``{'items', 'next_cursor'}``: the next ``page_size`` pending achievements after id ``after``."""
+    queryset = pending_achievements()
+    if after:
+        queryset = queryset.filter(id__gt=after)
+    items = list(queryset[:page_size + 1])
+    next_cursor = items[page_size - 1].pk if len(items) > page_size else None
+    return {'items': items[:page_size], 'next_cursor': next_cursor}
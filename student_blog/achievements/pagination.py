@@ -0,0 +1,79 @@
+"""
+Keyset (cursor) pagination over ``(created_at, id)``.
+
+Offset pagination gets slower the deeper you go because the database still
+walks every skipped row. Here each page starts from the last row seen, so
+page 500 costs the same as page 1 and rows added meanwhile never shift pages.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+
+PAGE_SIZE = 12
+
+
+def encode_cursor(obj):
+    """Opaque, URL-safe cursor for a row's position: a model instance or a ``values()`` dict."""
+    if isinstance(obj, dict):
+        created_at, pk = obj['created_at'], obj['id']
+    else:
+        created_at, pk = obj.created_at, obj.pk
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return ``(created_at, pk)`` for a cursor, or None if it is malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, after=None, before=None, page_size=PAGE_SIZE):
+    """
+    One page of ``queryset`` newest first, ordered by ``(-created_at, -id)``.
+
+    ``after`` fetches the rows following a cursor, ``before`` the rows
+    preceding it. Returns ``{'items', 'next_cursor', 'previous_cursor'}``;
+    a cursor is None when there is nothing further in that direction.
+    """
+    after, before = decode_cursor(after), decode_cursor(before)
+    rows = list(_page_rows(queryset, after, before, page_size))
+    return _page(rows, after, before, page_size)
+
+
+def _page_rows(queryset, after, before, page_size):
+    """The page's rows plus one, which tells whether there is more; reversed for ``before``."""
+    if before:
+        created_at, pk = before
+        return (queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+                .order_by('created_at', 'id')[:page_size + 1])
+    if after:
+        created_at, pk = after
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+    return queryset.order_by('-created_at', '-id')[:page_size + 1]
+
+
+def _page(rows, after, before, page_size):
+    if before:
+        has_previous = len(rows) > page_size
+        items = rows[:page_size][::-1]
+        has_next = True
+    else:
+        has_next = len(rows) > page_size
+        items = rows[:page_size]
+        has_previous = after is not None
+
+    return {
+        'items': items,
+        'next_cursor': encode_cursor(items[-1]) if items and has_next else None,
+        'previous_cursor': encode_cursor(items[0]) if items and has_previous else None,
+    }
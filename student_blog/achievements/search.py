@@ -0,0 +1,151 @@
+"""
+Full-text search over achievements.
+
+On SQLite the text columns are mirrored into an FTS5 virtual table, kept in
+sync by the signal receivers below, and queried with bm25 ranking and prefix
+matching. Other databases fall back to the ``icontains`` filter the listing
+used before, so the rest of the app never needs to know which one is active.
+"""
+
+import base64
+import binascii
+import re
+
+from django.db import connection
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Achievement
+from .pagination import PAGE_SIZE
+
+FTS_TABLE = 'achievements_achievement_fts'
+INDEXED_FIELDS = ('name', 'event', 'competition', 'description')
+
+CREATE_FTS_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{', '.join(INDEXED_FIELDS)}, tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+)
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def to_match_expression(search_query):
+    """
+    Turn free text into a safe FTS5 query: every word must match, as a
+    prefix, so "hack ind" finds "Hackathon India". Returns '' for no words.
+    """
+    words = re.findall(r'\w+', search_query.lower())
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def index_achievement(achievement):
+    if not fts_enabled():
+        return
+    values = [getattr(achievement, field) or '' for field in INDEXED_FIELDS]
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [achievement.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(INDEXED_FIELDS)}) VALUES (%s, %s, %s, %s, %s)",
+            [achievement.pk, *values],
+        )
+
+
+def unindex_achievement(achievement_id):
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [achievement_id])
+
+
+def rebuild_index():
+    """Recreate the FTS table from the achievements table. Returns rows indexed."""
+    if not fts_enabled():
+        return 0
+    columns = ', '.join(INDEXED_FIELDS)
+    sources = ', '.join(f"COALESCE({field}, '')" for field in INDEXED_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        cursor.execute(CREATE_FTS_TABLE)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, {columns}) "
+            f"SELECT id, {sources} FROM {Achievement._meta.db_table}"
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def _encode_cursor(rank, pk):
+    return base64.urlsafe_b64encode(f"{rank!r}|{pk}".encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        rank, pk = raw.split('|')
+        return float(rank), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def search_page(search_query, after=None, page_size=PAGE_SIZE):
+    """
+    One page of approved achievements matching ``search_query``, best match
+    first. Pages by ``(rank, id)`` cursor, the same way ``keyset_page`` does
+    by date, and returns the same ``{'items', 'next_cursor',
+    'previous_cursor'}`` shape.
+
+    Paging is forward only: there is no ``before`` cursor, so
+    ``previous_cursor`` is always None. A query with no words matches
+    nothing; callers wanting the full listing instead check
+    ``to_match_expression`` first, as the achievements page does.
+    """
+    expression = to_match_expression(search_query)
+    if not expression:
+        return {'items': [], 'next_cursor': None, 'previous_cursor': None}
+
+    sql = (
+        f"SELECT f.rowid, f.rank FROM {FTS_TABLE} f "
+        f"JOIN {Achievement._meta.db_table} a ON a.id = f.rowid "
+        f"WHERE f.{FTS_TABLE} MATCH %s AND a.is_approved"
+    )
+    params = [expression]
+    position = _decode_cursor(after)
+    if position:
+        sql += " AND (f.rank > %s OR (f.rank = %s AND f.rowid > %s))"
+        params += [position[0], position[0], position[1]]
+    sql += " ORDER BY f.rank, f.rowid LIMIT %s"
+    params.append(page_size + 1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        ranked = cursor.fetchall()
+
+    has_next = len(ranked) > page_size
+    ranked = ranked[:page_size]
+    found = Achievement.objects.for_cards().in_bulk([pk for pk, _ in ranked])
+    items = [found[pk] for pk, _ in ranked if pk in found]
+    last_pk, last_rank = ranked[-1] if ranked else (None, None)
+
+    return {
+        'items': items,
+        'next_cursor': _encode_cursor(last_rank, last_pk) if has_next else None,
+        'previous_cursor': None,
+    }
+
+
+@receiver(post_save, sender=Achievement)
+def update_search_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Moderation, uploads and image metadata save only their own fields
+    if raw or (update_fields is not None and not set(INDEXED_FIELDS) & set(update_fields)):
+        return
+    index_achievement(instance)
+
+
+@receiver(post_delete, sender=Achievement)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_achievement(instance.pk)
@@ -102,6 +102,159 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
+    // Infinite scroll for the achievements listing: fetch the next cursor page
+    // as an HTML fragment and append it to the grid
+    const loadMoreBtn = document.getElementById('loadMore');
+    const achievementGrid = document.getElementById('achievementGrid');
+
+    if (loadMoreBtn && achievementGrid && loadMoreBtn.dataset.fragmentUrl) {
+        let loading = false;
+
+        const loadNextPage = function() {
+            if (loading || !loadMoreBtn.dataset.cursor) return;
+            loading = true;
+            loadMoreBtn.innerHTML = '<div class="loading"></div> Loading...';
+
+            const params = new URLSearchParams({ after: loadMoreBtn.dataset.cursor });
+            if (loadMoreBtn.dataset.search) params.set('search', loadMoreBtn.dataset.search);
+
+            fetch(`${loadMoreBtn.dataset.fragmentUrl}?${params}`, { headers: { 'Accept': 'application/json' } })
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                    return response.json();
+                })
+                .then(data => {
+                    achievementGrid.insertAdjacentHTML('beforeend', data.html);
+                    if (data.next_cursor) {
+                        loadMoreBtn.dataset.cursor = data.next_cursor;
+                        loadMoreBtn.href = `?${new URLSearchParams({ ...Object.fromEntries(params), after: data.next_cursor })}`;
+                        loadMoreBtn.innerHTML = '<i class="fas fa-spinner"></i> Load More Achievements';
+                    } else {
+                        loadMoreBtn.remove();
+                    }
+                })
+                .catch(() => {
+                    loadMoreBtn.innerHTML = '<i class="fas fa-spinner"></i> Load More Achievements';
+                    showNotification('Could not load more achievements.', 'error');
+                })
+                .finally(() => { loading = false; });
+        };
+
+        loadMoreBtn.addEventListener('click', function(e) {
+            e.preventDefault();
+            loadNextPage();
+        });
+
+        new IntersectionObserver(function(entries) {
+            if (entries[0].isIntersecting) loadNextPage();
+        }, { rootMargin: '400px 0px' }).observe(loadMoreBtn);
+    }
+
+    // Moderation queue: one achievement at a time, decided from the keyboard.
+    // Decisions are sent in batches, and the next items (and their images)
+    // are fetched while the current ones are still being read.
+    const moderationQueue = document.getElementById('moderationQueue');
+
+    if (moderationQueue) {
+        const emptyState = moderationQueue.querySelector('.moderation-empty');
+        const decisions = { approve: [], reject: [] };
+        const FLUSH_AT = 10;
+        const PREFETCH_BELOW = 5;
+        let flushTimer = null;
+        let fetching = false;
+
+        const queuedItems = () => moderationQueue.querySelectorAll('.moderation-item');
+
+        const preloadImages = function(items) {
+            items.forEach(item => {
+                if (item.dataset.image) new Image().src = item.dataset.image;
+            });
+        };
+
+        const showCurrent = function() {
+            const current = queuedItems()[0];
+            if (current) current.hidden = false;
+            emptyState.hidden = Boolean(current) || fetching;
+        };
+
+        const prefetch = function() {
+            if (fetching || !moderationQueue.dataset.cursor || queuedItems().length >= PREFETCH_BELOW) return;
+            fetching = true;
+            const params = new URLSearchParams({ after: moderationQueue.dataset.cursor });
+            fetch(`${moderationQueue.dataset.nextUrl}?${params}`, { headers: { 'Accept': 'application/json' } })
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                    return response.json();
+                })
+                .then(data => {
+                    const before = queuedItems().length;
+                    emptyState.insertAdjacentHTML('beforebegin', data.html);
+                    preloadImages(Array.from(queuedItems()).slice(before));
+                    moderationQueue.dataset.cursor = data.next_cursor || '';
+                })
+                .catch(() => showNotification('Could not load more achievements.', 'error'))
+                .finally(() => {
+                    fetching = false;
+                    showCurrent();
+                });
+        };
+
+        const flush = function(keepalive = false) {
+            clearTimeout(flushTimer);
+            flushTimer = null;
+            if (!decisions.approve.length && !decisions.reject.length) return;
+            const body = JSON.stringify(decisions);
+            decisions.approve = [];
+            decisions.reject = [];
+            fetch(moderationQueue.dataset.decideUrl, {
+                method: 'POST',
+                keepalive: keepalive,
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': moderationQueue.dataset.csrfToken,
+                },
+                body: body,
+            })
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                })
+                .catch(() => showNotification('Some decisions could not be saved; reload to retry.', 'error'));
+        };
+
+        const decide = function(action) {
+            const current = queuedItems()[0];
+            if (!current) return;
+            if (action in decisions) {
+                decisions[action].push(Number(current.dataset.id));
+                if (decisions.approve.length + decisions.reject.length >= FLUSH_AT) {
+                    flush();
+                } else if (!flushTimer) {
+                    flushTimer = setTimeout(flush, 2000);
+                }
+            }
+            current.remove();
+            showCurrent();
+            prefetch();
+        };
+
+        document.addEventListener('keydown', function(e) {
+            if (e.ctrlKey || e.metaKey || e.altKey || e.target.closest('input, textarea, select')) return;
+            const action = { a: 'approve', r: 'reject', s: 'skip', j: 'skip' }[e.key.toLowerCase()];
+            if (action) {
+                e.preventDefault();
+                decide(action);
+            }
+        });
+        document.querySelectorAll('[data-moderation-action]').forEach(button => {
+            button.addEventListener('click', () => decide(button.dataset.moderationAction));
+        });
+        window.addEventListener('pagehide', () => flush(true));
+
+        preloadImages(queuedItems());
+        showCurrent();
+        prefetch();
+    }
+
     // Navbar scroll effect
     let lastScrollTop = 0;
     const navbar = document.querySelector('.navbar');
@@ -0,0 +1,134 @@
+"""
+Cached figures for the home page, and counters for the staff dashboard.
+
+The approved-achievement count, the student count and the featured cards are
+kept in the ``home`` cache namespace as one entry, so a warm home page renders without a single
+query. Any save or delete of an ``Achievement`` or ``User`` drops the entry,
+as does each batch of ``moderation.moderate``, and code that changes
+achievements with ``queryset.update()`` (which sends no signals) by calling
+``invalidate_home_stats`` itself. The next visitor recomputes it, once,
+however many arrive together.
+
+The staff dashboard counters are two conditional aggregates, one per table.
+With ``ADMIN_DASHBOARD_SNAPSHOT_MAX_AGE`` set they are read instead from the
+latest ``DashboardSnapshot`` written by ``manage.py refresh_dashboard_stats``,
+for sites where counting every row on each visit is too slow.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import CacheNamespace
+from .models import Achievement, DashboardSnapshot
+from .moderation import achievements_moderated
+
+HOME_STATS_KEY = 'stats'
+HOME_STATS_TIMEOUT = 60 * 60  # a safety net; invalidation normally comes first
+home_cache = CacheNamespace('home', timeout=HOME_STATS_TIMEOUT)
+FEATURED_COUNT = 6
+DASHBOARD_COUNTERS = ('student_count', 'staff_count', 'achievement_count',
+                      'pending_approvals', 'approved_achievements')
+
+
+def home_stats():
+    """``{'featured_achievements', 'total_achievements', 'total_students'}``, cached."""
+    return home_cache.get_or_set(HOME_STATS_KEY, _compute_home_stats)
+
+
+def _compute_home_stats():
+    approved = Achievement.objects.filter(is_approved=True)
+    return {
+        'featured_achievements': list(approved.for_cards().order_by('-created_at')[:FEATURED_COUNT]),
+        'total_achievements': approved.count(),
+        'total_students': User.objects.filter(is_staff=False).count(),
+    }
+
+
+def invalidate_home_stats():
+    """
+    Drop the cached figures now and again when the current transaction
+    commits, so a page rendered mid-transaction can't cache stale numbers.
+    """
+    home_cache.delete(HOME_STATS_KEY)
+    transaction.on_commit(lambda: home_cache.delete(HOME_STATS_KEY))
+
+
+def _user_counters():
+    return {
+        'student_count': Count('id', filter=Q(is_staff=False)),
+        'staff_count': Count('id', filter=Q(is_staff=True)),
+    }
+
+
+def _achievement_counters():
+    return {
+        'achievement_count': Count('id'),
+        'pending_approvals': Count('id', filter=Q(is_approved=False)),
+        'approved_achievements': Count('id', filter=Q(is_approved=True)),
+    }
+
+
+def dashboard_counts():
+    """Staff dashboard counters, in one query per table."""
+    users = User.objects.aggregate(**_user_counters())
+    achievements = Achievement.objects.aggregate(**_achievement_counters())
+    return {**users, **achievements}
+
+
+def refresh_dashboard_snapshot(keep=48):
+    """Store the current counters as a new snapshot, keeping the latest ``keep``."""
+    snapshot = DashboardSnapshot.objects.create(**dashboard_counts())
+    stale = DashboardSnapshot.objects.order_by('-created_at', '-id').values_list('id', flat=True)[keep:]
+    DashboardSnapshot.objects.filter(id__in=list(stale)).delete()
+    return snapshot
+
+
+def admin_dashboard_counts():
+    """
+    ``(counts, as_of)``: counters from a recent enough snapshot, with its
+    time, or live counts and None when snapshots are off or out of date.
+    """
+    snapshots = _recent_snapshots()
+    snapshot = snapshots.first() if snapshots is not None else None
+    if snapshot is not None:
+        return _snapshot_counts(snapshot), snapshot.created_at
+    return dashboard_counts(), None
+
+
+def _recent_snapshots():
+    """Snapshots young enough to show, newest first, or None when snapshots are off."""
+    max_age = getattr(settings, 'ADMIN_DASHBOARD_SNAPSHOT_MAX_AGE', None)
+    if max_age is None:
+        return None
+    return DashboardSnapshot.objects.filter(created_at__gte=timezone.now() - timedelta(seconds=max_age))
+
+
+def _snapshot_counts(snapshot):
+    return {field: getattr(snapshot, field) for field in DASHBOARD_COUNTERS}
+
+
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Achievement)
+def achievement_changed(sender, **kwargs):
+    invalidate_home_stats()
+
+
+@receiver(achievements_moderated)
+def achievements_moderated_changed(sender, **kwargs):
+    invalidate_home_stats()  # once per moderated batch
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, update_fields=None, **kwargs):
+    # Logging in saves last_login, which none of the figures depend on
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_home_stats()
@@ -0,0 +1,174 @@
+"""
+Content-addressed storage for uploaded images.
+
+Files are named after the SHA-256 of their bytes and sharded two levels deep:
+``blobs/3f/a9/3fa9...e1.png``. Uploading the same certificate twice stores it
+once and both records point at the same blob. Names already inside
+``BLOB_DIR`` are written as given, so derived files such as thumbnails
+(``3fa9...e1.w320.webp``) sit next to their blob.
+
+A blob can be shared, so nothing is deleted when one record lets go of it.
+``reference_counts`` counts the records using each blob across
+``REFERENCE_FIELDS``, and ``collect_garbage`` (``manage.py collect_media``)
+removes blobs and derivatives no record points at.
+"""
+
+import hashlib
+import os
+import time
+import uuid
+from collections import Counter
+
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+BLOB_DIR = 'blobs'
+TEMP_DIR = f'{BLOB_DIR}/tmp'
+HASH_LENGTH = 64  # hex digits in a SHA-256
+CHUNK_SIZE = 64 * 1024
+
+# (app_label.Model, field) pairs whose files live in content-addressed storage
+REFERENCE_FIELDS = [
+    ('achievements.Achievement', 'image'),
+    ('achievements.StudentProfile', 'avatar'),
+]
+
+
+def blob_hash(name):
+    """The content hash a blob or derivative name belongs to, or None."""
+    if not name or not name.startswith(f'{BLOB_DIR}/'):
+        return None
+    digest = os.path.basename(name)[:HASH_LENGTH]
+    if len(digest) == HASH_LENGTH and all(c in '0123456789abcdef' for c in digest):
+        return digest
+    return None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """``FileSystemStorage`` that names files by the SHA-256 of their content."""
+
+    def get_available_name(self, name, max_length=None):
+        # Equal names mean equal content, so an existing name is never a clash
+        return name
+
+    def blob_name(self, digest, ext):
+        return f'{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+    def _save(self, name, content):
+        temp_path = self.path(f'{TEMP_DIR}/{uuid.uuid4().hex}.part')
+        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
+
+        # Hash while copying, one chunk at a time, so large files never sit in memory
+        digest = hashlib.sha256()
+        fd = os.open(temp_path, self.OS_OPEN_FLAGS, 0o666)
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+        if blob_hash(name) is None:
+            name = self.blob_name(digest.hexdigest(), os.path.splitext(name)[1].lower())
+        validate_file_name(name, allow_relative_path=True)
+        full_path = self.path(name)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if blob_hash(name) == digest.hexdigest() and os.path.exists(full_path):
+            os.remove(temp_path)  # Already stored; refresh its age for collect_garbage
+            os.utime(full_path)
+        else:
+            os.replace(temp_path, full_path)
+            if self.file_permissions_mode is not None:
+                os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+
+media_storage = ContentAddressedStorage()
+
+
+def reference_counts():
+    """``Counter`` of blob hash -> number of records pointing at that blob."""
+    from django.apps import apps
+
+    counts = Counter()
+    for model_label, field in REFERENCE_FIELDS:
+        names = (apps.get_model(model_label).objects
+                 .filter(**{f'{field}__startswith': f'{BLOB_DIR}/'})
+                 .values_list(field, flat=True))
+        counts.update(digest for digest in map(blob_hash, names.iterator()) if digest)
+    return counts
+
+
+def collect_garbage(storage=media_storage, grace_seconds=3600, dry_run=False):
+    """
+    Delete blobs, and their derivatives, that no record references. Files
+    younger than ``grace_seconds`` are kept: an upload is written before the
+    record pointing at it is saved. Returns counts of files and bytes freed.
+    """
+    referenced = reference_counts()
+    cutoff = time.time() - grace_seconds
+    root = storage.path(BLOB_DIR)
+    summary = {'scanned': 0, 'referenced_blobs': len(referenced),
+               'shared_blobs': sum(1 for count in referenced.values() if count > 1),
+               'deleted': 0, 'bytes_freed': 0}
+
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+            summary['scanned'] += 1
+            if blob_hash(name) in referenced:
+                continue
+            stat = os.stat(path)
+            if stat.st_mtime > cutoff:
+                continue
+            summary['deleted'] += 1
+            summary['bytes_freed'] += stat.st_size
+            if not dry_run:
+                os.remove(path)
+    return summary
+
+
+def adopt_legacy_files(storage=media_storage):
+    """
+    Move files uploaded before content addressing into blobs and repoint their
+    records. Returns ``(records_updated, legacy_files_removed)``.
+    """
+    from django.apps import apps
+
+    updated, moved = 0, set()
+    for model_label, field in REFERENCE_FIELDS:
+        model = apps.get_model(model_label)
+        legacy = (model.objects.exclude(**{f'{field}__startswith': f'{BLOB_DIR}/'})
+                  .exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}))
+        for pk, name in legacy.values_list('pk', field).iterator():
+            if not storage.exists(name):
+                continue
+            with storage.open(name, 'rb') as legacy_file:
+                blob = storage.save(name, legacy_file)
+            changes = {field: blob}
+            if model_label == 'achievements.Achievement':
+                changes['thumbnail_widths'] = None  # regenerate next to the blob
+                changes['updated_at'] = timezone.now()  # re-keys cached cards
+            updated += model.objects.filter(pk=pk, **{field: name}).update(**changes)
+            moved.add(name)
+    from .models import thumbnail_path
+    from .stats import invalidate_home_stats
+    from .thumbnails import THUMBNAIL_FORMATS, THUMBNAIL_WIDTHS
+
+    if updated:
+        invalidate_home_stats()
+
+    for name in moved:
+        storage.delete(name)
+        for width in THUMBNAIL_WIDTHS:
+            for ext, _, _ in THUMBNAIL_FORMATS:
+                storage.delete(thumbnail_path(name, width, ext))
+    return updated, len(moved)
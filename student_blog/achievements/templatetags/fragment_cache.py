@@ -0,0 +1,35 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+
+from ..fragments import fragment_cache
+
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+
+    def __init__(self, nodelist, fragment_name, vary_on):
+        self.nodelist, self.fragment_name, self.vary_on = nodelist, fragment_name, vary_on
+
+    def render(self, context):
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        key = make_template_fragment_key(self.fragment_name, vary_on)
+        return fragment_cache.get_or_set(key, lambda: self.nodelist.render(context))
+
+
+@register.tag('fragment')
+def do_fragment(parser, token):
+    """
+    Cache the enclosed template in the fragment cache namespace, keyed on the
+    fragment name and any variables after it, like Django's ``{% cache %}``
+    without the timeout::
+
+        {% fragment achievement_card achievement.id achievement.updated_at %} ... {% endfragment %}
+    """
+    nodelist = parser.parse(('endfragment',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires at least 1 argument.")
+    return FragmentCacheNode(nodelist, bits[1], [parser.compile_filter(bit) for bit in bits[2:]])
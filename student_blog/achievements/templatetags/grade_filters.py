@@ -1,6 +1,8 @@
 
 from django import template
 
+from ..cgpa_calculator import GRADE_SCALE
+
 
 register = template.Library()
 
@@ -11,17 +13,8 @@ def get_item(dictionary, key):
 
 @register.filter
 def get_quality_points(grade_str):
-   
-    grade_dict = {
-        'A+': 5.0,
-        'A': 5.0,
-        'B+': 4.5,
-        'B': 4.0,
-        'C+': 3.5,
-        'C':3.0,
-        'D+':2.5,
-        'D':2.0,
-        'E+':1.5,
-        'E-':1.0
-    }
-    return grade_dict.get(grade_str.upper(), "N/A")  # Default to N/A if unknown
+    """Grade points for a letter grade, or "N/A" if it is not on the scale."""
+    points = GRADE_SCALE.get(grade_str)
+    if points is None:
+        points = GRADE_SCALE.get(str(grade_str).upper().strip(), "N/A")
+    return points
@@ -0,0 +1,97 @@
+"""
+Login throttling with token buckets kept in the cache.
+
+Each client IP and each username has a bucket of ``capacity`` tokens refilled
+at ``per_minute`` (see ``LOGIN_THROTTLE`` in settings), and a failed login
+takes a token from both. An attempt finding the username's bucket empty is
+refused before ``authenticate`` runs, so guessing one account's password costs
+the server a cache read instead of a password hash. An empty IP bucket only
+refuses attempts whose password is wrong: many students share a campus or
+proxy address, and guesses from it must not lock the rest out. Successful
+logins take nothing.
+
+The client IP is ``REMOTE_ADDR``, or, behind ``TRUSTED_PROXY_COUNT`` reverse
+proxies that each append to ``X-Forwarded-For``, the address the outermost of
+them saw. Entries further left are the client's own claim and are ignored.
+
+A bucket is one ``(tokens, updated)`` cache entry, read and written without a
+lock: attempts racing each other can each spend the same token, which lets a
+few more guesses through under concurrency but never locks anyone out early.
+"""
+
+import math
+import time
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+
+from .caching import CacheNamespace
+
+throttle_cache = CacheNamespace('login-throttle', single_flight=False)
+
+
+class TokenBucket:
+
+    def __init__(self, name, capacity, per_minute):
+        self.name, self.capacity, self.rate = name, capacity, per_minute / 60
+
+    def _key(self, key):
+        return f'{self.name}:{key}'
+
+    def tokens(self, key, now=None):
+        """Tokens left in ``key``'s bucket, refilled up to ``now``."""
+        now = time.time() if now is None else now
+        state = throttle_cache.get(self._key(key))
+        if state is None:
+            return self.capacity
+        tokens, updated = state
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def consume(self, key, now=None):
+        now = time.time() if now is None else now
+        tokens = max(0, self.tokens(key, now) - 1)
+        # Once full again the entry carries no information, so let it expire then
+        throttle_cache.set(self._key(key), (tokens, now),
+                           math.ceil((self.capacity - tokens) / self.rate) + 1)
+
+    def retry_after(self, key, now=None):
+        """Seconds until ``key`` has a token again (0 if it has one now)."""
+        missing = 1 - self.tokens(key, now)
+        return max(0, math.ceil(missing / self.rate))
+
+
+def login_buckets():
+    return [TokenBucket(name, **limits) for name, limits in settings.LOGIN_THROTTLE.items()]
+
+
+def client_ip(request):
+    """The client's address, skipping the ``TRUSTED_PROXY_COUNT`` proxies in front of us."""
+    proxies = settings.TRUSTED_PROXY_COUNT
+    forwarded = [address.strip() for address in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+    if proxies and len(forwarded) >= proxies and forwarded[-proxies]:
+        return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _bucket_keys(request, username):
+    keys = {'ip': client_ip(request), 'username': (username or '').strip().lower()}
+    return [(bucket, keys[bucket.name]) for bucket in login_buckets()]
+
+
+def throttled_authenticate(request, username, password):
+    """
+    ``(user, retry_after)``: the user ``authenticate`` returns (or None), or
+    ``(None, seconds)`` if the attempt was refused. Only an empty username
+    bucket refuses without checking the password.
+    """
+    buckets = _bucket_keys(request, username)
+    now = time.time()
+    waits = {bucket.name: bucket.retry_after(key, now) for bucket, key in buckets}
+    if waits.get('username'):
+        return None, max(waits.values())
+    user = authenticate(request, username=username, password=password)
+    if user is not None:
+        return user, None
+    for bucket, key in buckets:
+        bucket.consume(key)
+    return None, max(waits.values()) or None
@@ -0,0 +1,131 @@
+"""
+Resized copies of uploaded achievement images.
+
+Cards show images at 80px or a few hundred pixels wide, but uploads are often
+full-size PNG scans. After an upload is committed, a background thread writes
+WebP and JPEG copies at each of ``THUMBNAIL_WIDTHS`` next to the original
+(see ``thumbnail_path``) and records which widths exist, so templates can
+offer them through ``srcset`` without checking storage. Existing uploads are
+processed with ``manage.py generate_thumbnails``.
+"""
+
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from .models import Achievement, thumbnail_path
+from .stats import invalidate_home_stats
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTHS = (160, 320, 640, 1024)
+
+# (extension, Pillow format, save options)
+THUMBNAIL_FORMATS = [('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True})]
+if features.check('webp'):
+    THUMBNAIL_FORMATS.insert(0, ('webp', 'WEBP', {'quality': 80, 'method': 4}))
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='thumbnails')
+    return _executor
+
+
+def _flatten(image):
+    """Paste an image with transparency onto white, for formats without alpha."""
+    if image.mode != 'RGBA':
+        return image.convert('RGB')
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def generate_thumbnails(image_field):
+    """
+    Write every thumbnail of ``image_field`` narrower than the original, in
+    each of ``THUMBNAIL_FORMATS``, replacing older copies. Returns the widths
+    written. Images are never upscaled.
+    """
+    with image_field.open('rb') as file:
+        source = Image.open(file)
+        source.load()
+    source = ImageOps.exif_transpose(source)
+    has_alpha = source.mode in ('RGBA', 'LA', 'PA') or 'transparency' in source.info
+    source = source.convert('RGBA' if has_alpha else 'RGB')
+
+    storage = image_field.storage
+    widths = [width for width in THUMBNAIL_WIDTHS if width < source.width]
+    for width in widths:
+        height = max(1, round(source.height * width / source.width))
+        resized = source.resize((width, height), Image.LANCZOS)
+        for ext, image_format, options in THUMBNAIL_FORMATS:
+            output = io.BytesIO()
+            (resized if image_format == 'WEBP' else _flatten(resized)).save(output, image_format, **options)
+            name = thumbnail_path(image_field.name, width, ext)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(output.getvalue()))
+    return widths
+
+
+def process_achievement(achievement_id):
+    """
+    Generate thumbnails for one achievement and record their widths. Returns
+    the widths, or None if the achievement has no usable uploaded image.
+    """
+    achievement = (Achievement.objects.filter(pk=achievement_id, image_available=True)
+                   .only('id', 'image').first())
+    if achievement is None or not achievement.image:
+        return None
+    try:
+        widths = generate_thumbnails(achievement.image)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        logger.warning("Could not generate thumbnails for %s", achievement.image.name, exc_info=True)
+        widths = []
+    # Match on the file name too, so a newer upload saved meanwhile isn't marked done.
+    # updated_at moves the cached card fragments to a fresh key.
+    if Achievement.objects.filter(pk=achievement_id, image=achievement.image.name).update(
+            thumbnail_widths=widths, updated_at=timezone.now()):
+        invalidate_home_stats()  # featured cards are cached with their srcset
+    return widths
+
+
+def _process_in_background(achievement_id):
+    try:
+        process_achievement(achievement_id)
+    except Exception:
+        logger.exception("Thumbnail generation failed for achievement %s", achievement_id)
+    finally:
+        # Worker threads open their own connections; don't leave them lying around
+        connections.close_all()
+
+
+def schedule_thumbnails(achievement_id):
+    """
+    Generate thumbnails once the current transaction commits: on a worker
+    thread normally, or inline when ``ACHIEVEMENT_THUMBNAILS_ASYNC`` is False.
+    """
+    if getattr(settings, 'ACHIEVEMENT_THUMBNAILS_ASYNC', True):
+        transaction.on_commit(lambda: _get_executor().submit(_process_in_background, achievement_id))
+    else:
+        transaction.on_commit(lambda: process_achievement(achievement_id))
+
+
+@receiver(post_save, sender=Achievement)
+def queue_thumbnails(sender, instance, raw=False, **kwargs):
+    if raw or 'thumbnail_widths' in instance.get_deferred_fields():
+        return
+    if instance.image_available and instance.thumbnail_widths is None:
+        schedule_thumbnails(instance.pk)
@@ -0,0 +1,213 @@
+"""
+Background processing of uploaded achievement images.
+
+The dashboard only stages an upload under ``uploads/staging/`` and records an
+``ImageUploadJob``; the request returns as soon as the file is on disk. The
+``process_uploads`` worker then claims jobs oldest first, validates the file
+with Pillow, re-encodes it (dropping EXIF and other metadata after applying
+the orientation tag), writes it to its final place through
+``achievement_image_path`` together with its thumbnails, and deletes the
+staged copy.
+
+Bad images fail straight away and their staged file is removed; anything
+else (a storage hiccup, say) is retried up to ``MAX_ATTEMPTS`` times and the
+staged file kept so the job can be retried from the admin. Jobs left in
+progress by a worker that died are put back in the queue by
+``requeue_stale_jobs``.
+
+All of this is opt-in: with ``ACHIEVEMENT_UPLOAD_QUEUE`` off (the default)
+the dashboard saves images in the request, and it should only be turned on
+where the worker is deployed, or staged images are never shown.
+"""
+
+import io
+import logging
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import Achievement, ImageUploadJob
+from .thumbnails import generate_thumbnails
+
+logger = logging.getLogger(__name__)
+
+STAGING_DIR = 'uploads/staging'
+MAX_ATTEMPTS = 3
+STALE_AFTER = timedelta(minutes=10)
+
+# Pillow format of the upload -> (format to re-encode as, extension, save options)
+OUTPUT_FORMATS = {
+    'JPEG': ('JPEG', 'jpg', {'quality': 90, 'optimize': True}),
+    'MPO': ('JPEG', 'jpg', {'quality': 90, 'optimize': True}),
+    'PNG': ('PNG', 'png', {'optimize': True}),
+    'GIF': ('PNG', 'png', {'optimize': True}),
+    'WEBP': ('WEBP', 'webp', {'quality': 90}),
+}
+
+
+class InvalidImage(Exception):
+    """The staged file is not an image we accept; retrying will not help."""
+
+
+def uses_upload_queue():
+    return getattr(settings, 'ACHIEVEMENT_UPLOAD_QUEUE', False)
+
+
+def stage_upload(achievement, uploaded_file):
+    """
+    Save ``uploaded_file`` to the staging area and queue it for ``achievement``,
+    which must already be saved. Large uploads are already in a temporary
+    file, so this is usually just a move.
+    """
+    ext = os.path.splitext(uploaded_file.name)[1].lower()[:10]
+    staged_name = default_storage.save(f'{STAGING_DIR}/{uuid.uuid4().hex}{ext}', uploaded_file)
+    return ImageUploadJob.objects.create(
+        achievement=achievement,
+        staged_name=staged_name,
+        original_name=os.path.basename(uploaded_file.name)[:255],
+    )
+
+
+def reencode_image(file):
+    """
+    Validate an image and re-encode it without its metadata. Returns
+    ``(bytes, extension)``; raises ``InvalidImage`` for anything unusable.
+    """
+    try:
+        with Image.open(file) as probe:
+            probe.verify()
+        file.seek(0)
+        image = Image.open(file)
+        source_format = image.format
+        image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, SyntaxError, OSError, ValueError) as e:
+        raise InvalidImage(f"Not a valid image: {e}") from e
+    if source_format not in OUTPUT_FORMATS:
+        raise InvalidImage(f"Unsupported image format: {source_format}")
+
+    output_format, ext, options = OUTPUT_FORMATS[source_format]
+    image = ImageOps.exif_transpose(image)
+    if output_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    output = io.BytesIO()
+    # Nothing from image.info (EXIF, ICC, text chunks) is passed on
+    image.save(output, output_format, **options)
+    return output.getvalue(), ext
+
+
+def claim_next_job():
+    """Mark the oldest pending job as processing and return it, or None."""
+    while True:
+        job = ImageUploadJob.objects.filter(status=ImageUploadJob.PENDING).order_by('created_at', 'id').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        # Only one worker can flip a given row from pending, however many are polling
+        claimed = ImageUploadJob.objects.filter(pk=job.pk, status=ImageUploadJob.PENDING).update(
+            status=ImageUploadJob.PROCESSING, started_at=now, attempts=F('attempts') + 1)
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def _update(job, **fields):
+    """
+    Write ``fields`` to the job. False if its row is gone: deleting the
+    achievement deletes its jobs too, and a saved job would raise then.
+    """
+    for name, value in fields.items():
+        setattr(job, name, value)
+    return bool(ImageUploadJob.objects.filter(pk=job.pk).update(**fields))
+
+
+def _finish(job, status, error=''):
+    return _update(job, status=status, error=error, finished_at=timezone.now())
+
+
+def process_job(job):
+    """Move one claimed job's image into place. Returns the job's new status."""
+    try:
+        with default_storage.open(job.staged_name, 'rb') as staged:
+            data, ext = reencode_image(staged)
+
+        achievement = Achievement.objects.get(pk=job.achievement_id)
+        achievement.image.save(f'upload.{ext}', ContentFile(data), save=False)
+        achievement.record_image_metadata()
+        achievement.thumbnail_widths = generate_thumbnails(achievement.image)
+        # In a savepoint, so a failed save (the achievement deleted meanwhile) leaves
+        # an enclosing transaction usable for recording the outcome
+        with transaction.atomic():
+            achievement.save(update_fields=[
+                'image', 'image_available', 'image_width', 'image_height', 'image_size',
+                'thumbnail_widths', 'updated_at',
+            ])
+    except InvalidImage as e:
+        _finish(job, ImageUploadJob.FAILED, str(e))
+    except Achievement.DoesNotExist:
+        _finish(job, ImageUploadJob.FAILED, "Achievement was deleted")
+    except Exception as e:
+        logger.exception("Upload job %s failed (attempt %s)", job.pk, job.attempts)
+        if job.attempts < MAX_ATTEMPTS:
+            kept = _update(job, status=ImageUploadJob.PENDING, error=str(e))
+        else:
+            kept = _finish(job, ImageUploadJob.FAILED, str(e))
+        if kept:
+            # Keep the staged file: the job is retried, or can be retried from the admin
+            return job.status
+        # The achievement was deleted while we worked, taking the job with it
+        job.status = ImageUploadJob.FAILED
+    else:
+        _finish(job, ImageUploadJob.DONE)
+
+    default_storage.delete(job.staged_name)
+    return job.status
+
+
+def requeue_stale_jobs(older_than=STALE_AFTER):
+    """Return jobs stuck in processing (e.g. a worker was killed) to the queue."""
+    return ImageUploadJob.objects.filter(
+        status=ImageUploadJob.PROCESSING, started_at__lt=timezone.now() - older_than,
+    ).update(status=ImageUploadJob.PENDING)
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 3)
+
+
+def queue_metrics(window=timedelta(hours=1)):
+    """
+    Queue depth by status, age of the oldest pending job, and upload-to-done
+    latency percentiles over jobs finished within ``window``.
+    """
+    now = timezone.now()
+    depth = dict(ImageUploadJob.objects.values_list('status').annotate(n=Count('id')).order_by())
+    oldest = ImageUploadJob.objects.filter(status=ImageUploadJob.PENDING).aggregate(
+        oldest=Min('created_at'))['oldest']
+    latencies = sorted(
+        (finished - created).total_seconds()
+        for created, finished in ImageUploadJob.objects.filter(
+            status=ImageUploadJob.DONE, finished_at__gte=now - window,
+        ).values_list('created_at', 'finished_at')
+    )
+    return {
+        **{status: depth.get(status, 0) for status, _ in ImageUploadJob.STATUS_CHOICES},
+        'oldest_pending_seconds': round((now - oldest).total_seconds(), 3) if oldest else None,
+        'processed_in_window': len(latencies),
+        'latency_p50_seconds': _percentile(latencies, 0.5),
+        'latency_p95_seconds': _percentile(latencies, 0.95),
+        'latency_max_seconds': round(latencies[-1], 3) if latencies else None,
+    }
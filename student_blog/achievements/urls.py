@@ -1,9 +1,10 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', views.home, name='home'),
     path('achievements/', views.achievements, name='achievements'),
+    path('achievements/more/', views.achievements_fragment, name='achievements_fragment'),
     path('signup/', views.signup, name='signup'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
@@ -12,15 +13,18 @@ urlpatterns = [
     path('delete-achievement/<int:achievement_id>/', views.delete_achievement, name='delete_achievement'),
     path('contact-submit/', views.contact_submit, name='contact_submit'),
     path('api/achievements/', views.get_achievements_api, name='achievements_api'),
+    path('api/v1/achievements/', api.achievements_v1, name='api_v1_achievements'),
     
     # Staff routes
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('register-staff/', views.register_staff, name='register_staff'),
-
-
-    
-    path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('students/<int:user_id>/compute-cgpa/', views.compute_and_store_student_cgpa, name='compute_student_cgpa'),
+    path('students/recompute-cgpa/', views.recompute_cohort_cgpa_view, name='recompute_cohort_cgpa'),
+    path('uploads/metrics/', views.upload_queue_metrics, name='upload_queue_metrics'),
+    path('moderation/', views.moderation_queue, name='moderation_queue'),
+    path('moderation/next/', views.moderation_queue_next, name='moderation_queue_next'),
+    path('moderation/decide/', views.moderation_decide, name='moderation_decide'),
+    path('cache/metrics/', views.cache_metrics_view, name='cache_metrics'),
 ]
 
 
@@ -1,58 +1,105 @@
-from decimal import ROUND_HALF_UP, Decimal
+import json
+import os
+from functools import partial
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import login, logout, authenticate
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.utils.functional import SimpleLazyObject
+from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponseForbidden
-from django.db.models import Q
-from .models import Achievement, StudentProfile, ContactMessage
-from .forms import AchievementForm, UserRegistrationForm, ProfileForm
+from django.views.decorators.http import require_POST
+from django.db import transaction
+from django.db.models import Count, Q, prefetch_related_objects
+from .models import Achievement, StudentProfile, ContactMessage, ModerationLog, Semester
+from .forms import AchievementForm, CourseUnitForm, UserRegistrationForm, ProfileForm
 from .admin_auth import staff_required, superuser_required
-
-from .cgpa_calculator import calculate_cgpa
-
-def home(request):
-    
+from .caching import cache_metrics
+from .moderation import moderate, pending_page
+from .pagination import keyset_page
+from .search import fts_enabled, search_page, to_match_expression
+from .stats import DASHBOARD_COUNTERS, admin_dashboard_counts, home_stats
+from .throttling import throttled_authenticate
+from .uploads import queue_metrics, stage_upload, uses_upload_queue
+
+from .cgpa_calculator import to_two_places
+from .grading import (
+    calculate_cgpa_for_student, cohort_queryset, recompute_cohort_cgpa, stored_cgpa_results,
+)
+
+# The async views below do all their blocking work, queries and rendering alike, in one
+# sync_to_async call. Django 4.2's async ORM runs on that same single thread anyway, so
+# awaiting queries one by one (or gathering them) would add thread hops without overlap.
+async def home(request):
+    return await sync_to_async(_home)(request)
+
+def _home(request):
     try:
-        featured_achievements = Achievement.objects.filter(is_approved=True).order_by('-created_at')[:6]
-        total_achievements = Achievement.objects.filter(is_approved=True).count()
-        total_students = User.objects.filter(is_staff=False).count()
+        # Counts and featured cards come from the cache while nothing has changed
+        context = home_stats()
     except Exception as e:
-        featured_achievements = []
-        total_achievements = 0
-        total_students = 0
+        context = {
+            'featured_achievements': [],
+            'total_achievements': 0,
+            'total_students': 0,
+        }
     
-    context = {
-        'featured_achievements': featured_achievements,
-        'total_achievements': total_achievements,
-        'total_students': total_students,
-    }
     return render(request, 'achievements/home.html', context)
 
-def achievements(request):
-    """All achievements page"""
+def approved_achievements(search_query=''):
+    """Approved achievements, narrowed by ``icontains`` when there is no FTS index."""
+    queryset = Achievement.objects.filter(is_approved=True).for_cards()
+    if search_query:
+        queryset = queryset.filter(
+            Q(name__icontains=search_query) |
+            Q(event__icontains=search_query) |
+            Q(competition__icontains=search_query) |
+            Q(description__icontains=search_query)
+        )
+    return queryset
+
+def achievements_page(search_query, after=None, before=None):
+    """Newest-first page of approved achievements, or ranked search results."""
+    if not to_match_expression(search_query):
+        search_query = ''  # no words, only punctuation: nothing to search for, so list everything
+    if search_query and fts_enabled():
+        return search_page(search_query, after=after)
+    return keyset_page(approved_achievements(search_query), after=after, before=before)
+
+async def achievements(request):
+    """All achievements page, paginated by cursor"""
+    return await sync_to_async(_achievements)(request)
+
+def _achievements(request):
     search_query = request.GET.get('search', '')
     
     try:
-        all_achievements = Achievement.objects.filter(is_approved=True).order_by('-created_at')
-        
-        if search_query:
-            all_achievements = all_achievements.filter(
-                Q(name__icontains=search_query) |
-                Q(event__icontains=search_query) |
-                Q(competition__icontains=search_query) |
-                Q(description__icontains=search_query)
-            )
+        page = achievements_page(search_query, request.GET.get('after'), request.GET.get('before'))
     except Exception as e:
-        all_achievements = []
+        page = {'items': [], 'next_cursor': None, 'previous_cursor': None}
     
     context = {
-        'achievements': all_achievements,
+        'achievements': page['items'],
+        'next_cursor': page['next_cursor'],
+        'previous_cursor': page['previous_cursor'],
         'search_query': search_query,
     }
     return render(request, 'achievements/achievements.html', context)
 
+async def achievements_fragment(request):
+    """Next page of achievement cards as an HTML fragment, for infinite scroll"""
+    return await sync_to_async(_achievements_fragment)(request)
+
+def _achievements_fragment(request):
+    page = achievements_page(request.GET.get('search', ''), after=request.GET.get('after'))
+    html = render_to_string('achievements/partials/achievement_cards.html',
+                            {'achievements': page['items']}, request=request)
+    return JsonResponse({'html': html, 'next_cursor': page['next_cursor']})
+
 def signup(request):
     
     if request.method == 'POST':
@@ -80,8 +127,13 @@ def login_view(request):
     if request.method == 'POST':
         username = request.POST.get('username')
         password = request.POST.get('password')
-        user = authenticate(request, username=username, password=password)
-        
+        user, retry_after = throttled_authenticate(request, username, password)
+
+        if retry_after:
+            messages.error(request, f'Too many failed login attempts. Please try again in {retry_after} seconds.')
+            response = render(request, 'achievements/login.html', status=429)
+            response['Retry-After'] = str(retry_after)
+            return response
         if user is not None:
             login(request, user)
             messages.success(request, f'Welcome back, {user.first_name or user.username}!')
@@ -103,41 +155,77 @@ def logout_view(request):
 
 @login_required
 def dashboard(request):
-   
-    # Initialize variables
+    """
+    Student dashboard: achievements, course units and the GPA/CGPA summary.
+
+    Runs a fixed number of queries however many achievements or units the
+    student has: the achievement list, one aggregate for the counts, the
+    profile, the semesters, and one query for their units if any semester
+    table is missing from the fragment cache.
+    """
+    form = AchievementForm()
+    course_form = CourseUnitForm(user=request.user)
+
+    # Handle form submission: the course form posts an 'add_course' flag
+    if request.method == 'POST':
+        if 'add_course' in request.POST:
+            course_form = CourseUnitForm(request.POST, user=request.user)
+            if course_form.is_valid():
+                course_form.save()
+                messages.success(request, "Course unit added successfully! GPA/CGPA re-calculated.")
+                return redirect('dashboard')
+        else:
+            form = AchievementForm(request.POST, request.FILES)
+            if form.is_valid():
+                try:
+                    achievement = form.save(commit=False)
+                    achievement.student = request.user
+                    upload = request.FILES.get('image') if uses_upload_queue() else None
+                    if upload:
+                        # Stage the file and let the process_uploads worker move it into place
+                        achievement.image = None
+                    achievement.save()
+                    if upload:
+                        stage_upload(achievement, upload)
+                        messages.success(request, ' Achievement submitted for approval! Your image is being processed.')
+                    else:
+                        messages.success(request, ' Achievement submitted for approval!')
+                    return redirect('dashboard')
+                except Exception as e:
+                    messages.error(request, f' Error submitting achievement: {str(e)}')
+            else:
+                messages.error(request, ' Please correct the errors below.')
+
     student_achievements = []
+    counts = {'total': 0, 'approved': 0}
     profile = None
-    approved_count = 0
-    form = AchievementForm()
-    
+    student_semesters = []
     try:
-        # Get user achievements and profile
-        student_achievements = Achievement.objects.filter(student=request.user).order_by('-created_at')
+        student_achievements = list(Achievement.objects.filter(student=request.user).order_by('-created_at'))
+        counts = Achievement.objects.filter(student=request.user).aggregate(
+            total=Count('id'),
+            approved=Count('id', filter=Q(is_approved=True)),
+        )
         profile = getattr(request.user, 'studentprofile', None)
-        approved_count = Achievement.objects.filter(student=request.user, is_approved=True).count()
+        student_semesters = list(Semester.objects.filter(student=request.user).order_by('id'))
+        attach_lazy_units(student_semesters)
     except Exception as e:
         print(f"Error loading dashboard data: {e}")
-    
-    # Handle form submission
-    if request.method == 'POST':
-        form = AchievementForm(request.POST, request.FILES)
-        if form.is_valid():
-            try:
-                achievement = form.save(commit=False)
-                achievement.student = request.user
-                achievement.save()
-                messages.success(request, ' Achievement submitted for approval!')
-                return redirect('dashboard')
-            except Exception as e:
-                messages.error(request, f' Error submitting achievement: {str(e)}')
-        else:
-            messages.error(request, ' Please correct the errors below.')
-    
+
+    # GPA and CGPA come from the running totals; the latest graded semester is 'Current GPA'
+    grade_results = stored_cgpa_results(profile, student_semesters)
+    last_gpa = list(grade_results['gpa_results'].values())[-1] if grade_results['gpa_results'] else 0.0
+
     context = {
         'achievements': student_achievements,
+        'achievement_count': counts['total'],
+        'approved_count': counts['approved'],
         'form': form,
         'profile': profile,
-        'approved_count': approved_count
+        'course_form': course_form,
+        'cgpa_results': grade_results,
+        'current_gpa': last_gpa,
+        'student_semesters': student_semesters,
     }
     return render(request, 'achievements/dashboard.html', context)
 
@@ -187,27 +275,6 @@ def delete_achievement(request, achievement_id):
     
     return redirect('dashboard')
 
-@staff_required
-def admin_dashboard(request):
-    """Staff-only dashboard"""
-    try:
-        student_count = User.objects.filter(is_staff=False).count()
-        staff_count = User.objects.filter(is_staff=True).count()
-        achievement_count = Achievement.objects.count()
-        pending_approvals = Achievement.objects.filter(is_approved=False).count()
-        approved_achievements = Achievement.objects.filter(is_approved=True).count()
-    except Exception as e:
-        student_count = staff_count = achievement_count = pending_approvals = approved_achievements = 0
-    
-    context = {
-        'student_count': student_count,
-        'staff_count': staff_count,
-        'achievement_count': achievement_count,
-        'pending_approvals': pending_approvals,
-        'approved_achievements': approved_achievements,
-    }
-    return render(request, 'achievements/admin_dashboard.html', context)
-
 @superuser_required
 def register_staff(request):
  
@@ -216,14 +283,11 @@ def register_staff(request):
         if form.is_valid():
             try:
                 user = form.save(commit=False)
-                # Make user staff
+                # Make user staff, with a profile marked as staff from the start
                 user.is_staff = True
-                user.save()
-                
-                # Update profile to mark as staff
-                profile = user.studentprofile
-                profile.is_student = False
-                profile.save()
+                user.pending_profile.is_student = False
+                with transaction.atomic():
+                    user.save()
                 
                 messages.success(request, f' Staff member {user.username} created successfully!')
                 return redirect('admin_dashboard')
@@ -272,13 +336,16 @@ def contact_submit(request):
     
     return redirect('home')
 
-def get_achievements_api(request):
+async def get_achievements_api(request):
     """API endpoint for achievements"""
+    return await sync_to_async(_get_achievements_api)(request)
+
+def _get_achievements_api(request):
     try:
         achievements = Achievement.objects.filter(is_approved=True).values(
             'id', 'name', 'event', 'prize', 'competition', 'image', 'description'
         )
-        return JsonResponse(list(achievements), safe=False)
+        return JsonResponse(list(achievements.iterator()), safe=False)
     except Exception as e:
         return JsonResponse([], safe=False)
 
@@ -290,76 +357,25 @@ def handler500(request):
     return render(request, '500.html', status=500)
 
 
-from django.shortcuts import render, redirect
-from django.contrib.auth.decorators import login_required
-from django.contrib import messages
-from .models import CourseUnit, Semester
-from .forms import CourseUnitForm
-
-
-# ... (other view imports)
-
-@login_required
-def dashboard(request):
-    
-    # --- 1. Handle Form Submission for New Course Unit ---
-    course_form = CourseUnitForm(user=request.user)
-    if request.method == 'POST':
-        if 'add_course' in request.POST: # Check if the course submission button was clicked
-            course_form = CourseUnitForm(request.POST, user=request.user)
-            if course_form.is_valid():
-                course_form.save()
-                messages.success(request, "Course unit added successfully! GPA/CGPA re-calculated.")
-                return redirect('dashboard') # Redirect to prevent resubmission
-        
-      
-    student_semesters = Semester.objects.filter(student=request.user).prefetch_related('course_units').order_by('id')
-    
-    # Transform model data into the format required by calculate_cgpa
-    student_grades_data = {}
-    last_gpa = 0.0
-    
-    for semester in student_semesters:
-        semester_units = []
-        for unit in semester.course_units.all():
-            if unit.grade:
-                semester_units.append({
-                    'subject': unit.unit_name,
-                    'grade': unit.grade,
-                    'credits': float(unit.credits), # Convert Decimal to float for calculation
-                })
-        
-        # Only add semesters that have graded units
-        if semester_units:
-            student_grades_data[semester.name] = semester_units
-
-    # --- 3. Compute GPA and CGPA ---
-    grade_results = {'cgpa': 0.0, 'total_credits': 0.0, 'gpa_results': {}}
-    
-    if student_grades_data:
-        grade_results = calculate_cgpa(student_grades_data)
-        
-        # Determine the latest semester GPA to display as 'Current GPA'
-        if grade_results['gpa_results']:
-            # Get the GPA of the last semester processed
-            last_semester_name = list(student_grades_data.keys())[-1]
-            last_gpa = grade_results['gpa_results'].get(last_semester_name, 0.0)
-
-
-    # ... (Your existing achievement fetching and counting logic)
-
-    context = {
-        # ... your existing context variables (achievements, approved_count, etc.)
-        'course_form': course_form,
-        'cgpa_results': grade_results,
-        'current_gpa': last_gpa,
-        'student_semesters': student_semesters, # Pass full data for displaying tables
-    }
-
-    return render(request, 'achievements/dashboard.html', context)
+def attach_lazy_units(semesters):
+    """
+    Give each semester a ``units`` list that is only loaded when used.
 
+    The first semester to need its units prefetches them for all of
+    ``semesters`` in one query, so cached semester tables cost nothing and
+    uncached ones cost a single query between them.
+    """
+    fetched = False
 
+    def units_of(semester):
+        nonlocal fetched
+        if not fetched:
+            prefetch_related_objects(semesters, 'course_units')
+            fetched = True
+        return list(semester.course_units.all())
 
+    for semester in semesters:
+        semester.units = SimpleLazyObject(partial(units_of, semester))
 
 
 def build_grades_data_for_user(user):
@@ -379,30 +395,64 @@ def build_grades_data_for_user(user):
             student_grades_data[semester.name] = semester_units
     return student_grades_data
 
+STUDENTS_PER_PAGE = 25
+
+
+def search_students(search_query=''):
+    """Non-staff users with their profile, by username, optionally filtered."""
+    students = (User.objects.filter(is_staff=False).select_related('studentprofile')
+                .only('username', 'first_name', 'last_name', 'email',
+                      'studentprofile__roll_number', 'studentprofile__department',
+                      'studentprofile__year', 'studentprofile__cgpa')
+                .order_by('username'))
+    if search_query:
+        students = students.filter(
+            Q(username__icontains=search_query) |
+            Q(first_name__icontains=search_query) |
+            Q(last_name__icontains=search_query) |
+            Q(email__icontains=search_query) |
+            Q(studentprofile__roll_number__icontains=search_query) |
+            Q(studentprofile__department__icontains=search_query)
+        )
+    return students
+
+
+def students_page(search_query, page_number, count=None):
+    """A page of ``search_students``, with its rows already fetched."""
+    paginator = Paginator(search_students(search_query), STUDENTS_PER_PAGE)
+    if count is not None:
+        paginator.count = count
+    page = paginator.get_page(page_number)
+    page.object_list = list(page.object_list)
+    return page
+
+
 @staff_required
-def admin_dashboard(request):
+async def admin_dashboard(request):
     """
-    Staff-only admin dashboard. Includes a list of students (non-staff users).
+    Staff-only admin dashboard: site counters and a paginated, searchable
+    list of students (non-staff users) for staff to view and compute CGPA.
     """
+    return await sync_to_async(_admin_dashboard)(request)
+
+
+def _admin_dashboard(request):
     try:
-        student_count = User.objects.filter(is_staff=False).count()
-        staff_count = User.objects.filter(is_staff=True).count()
-        achievement_count = Achievement.objects.count()
-        pending_approvals = Achievement.objects.filter(is_approved=False).count()
-        approved_achievements = Achievement.objects.filter(is_approved=True).count()
+        counts, counts_as_of = admin_dashboard_counts()
     except Exception as e:
-        student_count = staff_count = achievement_count = pending_approvals = approved_achievements = 0
+        counts = dict.fromkeys(DASHBOARD_COUNTERS, 0)
+        counts_as_of = None
 
-    # New: list of students for staff to view and compute CGPA
-    students_list = User.objects.filter(is_staff=False).select_related('studentprofile').order_by('username')
+    search_query = request.GET.get('q', '').strip()
+    # Live student count is exact, so spare the paginator its own COUNT(*)
+    student_count = counts['student_count'] if not search_query and counts_as_of is None else None
+    students = students_page(search_query, request.GET.get('page'), student_count)
 
     context = {
-        'student_count': student_count,
-        'staff_count': staff_count,
-        'achievement_count': achievement_count,
-        'pending_approvals': pending_approvals,
-        'approved_achievements': approved_achievements,
-        'students_list': students_list,
+        **counts,
+        'counts_as_of': counts_as_of,
+        'students_page': students,
+        'search_query': search_query,
     }
     return render(request, 'achievements/admin_dashboard.html', context)
 
@@ -417,18 +467,14 @@ def compute_and_store_student_cgpa(request, user_id):
         return JsonResponse({'error': 'Target user is staff; cannot compute.'}, status=400)
 
     
-    student_grades_data = build_grades_data_for_user(target_user)
-
-    if not student_grades_data:
-        return JsonResponse({'error': 'No graded units found for this student.'}, status=400)
-
-    
     try:
-        result = calculate_cgpa(student_grades_data)
-       
+        result = calculate_cgpa_for_student(target_user)
     except Exception as e:
         return JsonResponse({'error': f'Error computing CGPA: {str(e)}'}, status=500)
 
+    if not result['gpa_results']:
+        return JsonResponse({'error': 'No graded units found for this student.'}, status=400)
+
     # Persist to StudentProfile
     try:
         profile = getattr(target_user, 'studentprofile', None)
@@ -436,19 +482,11 @@ def compute_and_store_student_cgpa(request, user_id):
            
             profile = StudentProfile.objects.create(user=target_user, roll_number=f"STU{target_user.id:04d}", is_student=True)
        
-        cgpa_val = result.get('cgpa', None)
-        if cgpa_val is not None:
-            profile.cgpa = Decimal(str(cgpa_val)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        else:
-            profile.cgpa = None
+        profile.cgpa = to_two_places(result.get('cgpa', None))
+        profile.total_credits = to_two_places(result.get('total_credits', None))
+        profile.total_quality_points = to_two_places(result.get('total_gpa_points', 0.0))
 
-        total_credits_val = result.get('total_credits', None)
-        if total_credits_val is not None:
-            profile.total_credits = Decimal(str(total_credits_val)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        else:
-            profile.total_credits = None
-
-        profile.save()
+        profile.save(update_fields=['cgpa', 'total_credits', 'total_quality_points', 'updated_at'])
     except Exception as e:
         return JsonResponse({'error': f'Error saving CGPA: {str(e)}'}, status=500)
 
@@ -458,4 +496,86 @@ def compute_and_store_student_cgpa(request, user_id):
         'cgpa': float(profile.cgpa) if profile.cgpa is not None else None,
         'total_credits': float(profile.total_credits) if profile.total_credits is not None else None,
         'gpa_results': result.get('gpa_results', {}),
-    })
\ No newline at end of file
+    })
+
+
+@staff_required
+@require_POST
+def recompute_cohort_cgpa_view(request):
+    """
+    Recompute CGPA for all students in one pass. ``department`` and ``year``
+    in the POST body narrow the run to a cohort.
+    """
+    year = request.POST.get('year')
+    if year and not year.isdigit():
+        return JsonResponse({'error': 'Year must be a number.'}, status=400)
+
+    students = cohort_queryset(
+        department=request.POST.get('department') or None,
+        year=int(year) if year else None,
+    )
+    try:
+        summary = recompute_cohort_cgpa(students)
+    except Exception as e:
+        return JsonResponse({'error': f'Error recomputing CGPA: {str(e)}'}, status=500)
+
+    return JsonResponse({'success': True, **summary})
+
+
+@staff_required
+def moderation_queue(request):
+    """
+    Pending achievements, oldest first, for staff to approve or reject from
+    the keyboard. The page script fetches further items and posts decisions.
+    """
+    page = pending_page()
+    context = {
+        'achievements': page['items'],
+        'next_cursor': page['next_cursor'],
+    }
+    return render(request, 'achievements/moderation_queue.html', context)
+
+
+@staff_required
+def moderation_queue_next(request):
+    """The next pending achievements after ``after`` as an HTML fragment."""
+    after = request.GET.get('after', '')
+    if after and not after.isdigit():
+        return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+    page = pending_page(after=int(after) if after else None)
+    html = render_to_string('achievements/partials/moderation_items.html',
+                            {'achievements': page['items']}, request=request)
+    return JsonResponse({'html': html, 'next_cursor': page['next_cursor']})
+
+
+@staff_required
+@require_POST
+def moderation_decide(request):
+    """
+    Apply a batch of queue decisions, posted as JSON
+    ``{"approve": [ids], "reject": [ids]}``.
+    """
+    try:
+        decisions = json.loads(request.body)
+        approve = [int(pk) for pk in decisions.get('approve', [])]
+        reject = [int(pk) for pk in decisions.get('reject', [])]
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'error': 'Expected {"approve": [ids], "reject": [ids]}.'}, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'approved': moderate(approve, ModerationLog.APPROVE, request.user),
+        'rejected': moderate(reject, ModerationLog.REJECT, request.user),
+    })
+
+
+@staff_required
+def cache_metrics_view(request):
+    """Hit, miss and eviction counts of each cache namespace in this process."""
+    return JsonResponse({'pid': os.getpid(), 'namespaces': cache_metrics()})
+
+
+@staff_required
+def upload_queue_metrics(request):
+    """Depth and processing latency of the image upload queue, for monitoring."""
+    return JsonResponse(queue_metrics())